@@ -1,4 +1,8 @@
+import multiprocessing
+
 from .cli import main
 
 if __name__ == "__main__":
+    # Needed for process pools in the frozen (PyInstaller) build on Windows
+    multiprocessing.freeze_support()
     raise SystemExit(main())
\ No newline at end of file
@@ -16,14 +16,134 @@ def main(argv=None) -> int:
     p_core = sub.add_parser("core", help="Run scan + CSV report without GUI.")
     p_core.add_argument("-i", "--input", required=True, help="Path to MCD output file to scan.")
     p_core.add_argument("-o", "--outdir", required=True, help="Folder to write the CSV report into.")
-    p_core.add_argument("--target", default=None, help="Target (child) search text.")
-    p_core.add_argument("--parent", default=None, help="Parent search text.")
-    p_core.add_argument("--no-parent", action="store_true", help="Disable parent lookup.")
-    p_core.add_argument("--opno", default=None, help="Operation number search text.")
-    p_core.add_argument("--toolchg", default=None, help="Tool change search text.")
-    p_core.add_argument("--case", action="store_true", help="Case sensitive search.")
+    _add_search_args(p_core)
+    p_core.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Scan large files in parallel with this many processes (0 = all cores; default: 1).",
+    )
+    p_core.add_argument(
+        "--use-index",
+        action="store_true",
+        help="Use (and build on first run) the cached per-file context index.",
+    )
+    p_core.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Resume from where the previous --incremental run on this file stopped; report only new hits.",
+    )
+    p_core.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write report rows as hits are found; the total goes to a *_summary.json sidecar.",
+    )
+    p_core.add_argument(
+        "--format",
+        choices=("csv", "parquet", "arrow"),
+        default="csv",
+        help="Report format; parquet/arrow need the optional pyarrow package (default: csv).",
+    )
+    p_core.add_argument(
+        "--db",
+        nargs="?",
+        const="",
+        default=None,
+        help="Append results to a SQLite report database instead of writing a CSV "
+             "(default database: reports.sqlite in the config dir).",
+    )
+    p_core.add_argument(
+        "--summary",
+        action="store_true",
+        help="Also write a per-operation summary (*_operations.csv) built during the scan.",
+    )
+    p_core.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Write only the per-operation summary, not the per-hit report.",
+    )
     p_core.add_argument("--print-report-path", action="store_true", help="Print the report path after writing.")
 
+    # Batch runner
+    p_batch = sub.add_parser("batch", help="Scan many files (directory, glob or list) across a process pool.")
+    p_batch.add_argument("inputs", nargs="*", help="Files, directories or glob patterns to scan.")
+    p_batch.add_argument("--file-list", default=None, help="Text file with one input path per line.")
+    p_batch.add_argument("-r", "--recursive", action="store_true", help="Recurse into directories (and '**' globs).")
+    p_batch.add_argument("-o", "--outdir", required=True, help="Folder to write the CSV report(s) into.")
+    _add_search_args(p_batch)
+    p_batch.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of files scanned at once (0 = all cores; default: 0).",
+    )
+    p_batch.add_argument(
+        "--combined",
+        action="store_true",
+        help="Write one combined report with a source_file column instead of one report per file.",
+    )
+    p_batch.add_argument(
+        "--db",
+        nargs="?",
+        const="",
+        default=None,
+        help="Append results to a SQLite report database instead of writing CSVs "
+             "(default database: reports.sqlite in the config dir).",
+    )
+
+    # Watch-folder daemon
+    p_watch = sub.add_parser("watch", help="Watch a folder and scan each new NC file once it has been written.")
+    p_watch.add_argument("directory", help="Folder to watch.")
+    p_watch.add_argument("-o", "--outdir", required=True, help="Folder to write the CSV reports into.")
+    _add_search_args(p_watch)
+    p_watch.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Number of files hashed / scanned at once (0 = all cores; default: 0).",
+    )
+    p_watch.add_argument(
+        "--pattern",
+        action="append",
+        default=None,
+        help="Only pick up file names matching this glob (e.g. '*.nc'); repeatable.",
+    )
+    p_watch.add_argument(
+        "--settle",
+        type=float,
+        default=2.0,
+        help="Seconds a file must stay unchanged before it is scanned (default: 2).",
+    )
+    p_watch.add_argument("--existing", action="store_true", help="Also scan the files already in the folder.")
+    p_watch.add_argument(
+        "--poll",
+        action="store_true",
+        help="Poll the folder instead of using inotify (needed for network shares written by other hosts).",
+    )
+    p_watch.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds between folder listings when polling (default: 1).",
+    )
+
+    # Scan server
+    p_serve = sub.add_parser("serve", help="Run a warm scan server with a local HTTP/JSON API (NDJSON results).")
+    p_serve.add_argument(
+        "--port",
+        type=int,
+        default=8765,
+        help="Port to listen on at 127.0.0.1 (default: 8765).",
+    )
+    p_serve.add_argument("--unix", default=None, metavar="PATH", help="Listen on this Unix socket instead of TCP.")
+    p_serve.add_argument(
+        "--max-scans",
+        type=int,
+        default=0,
+        help="Scans run at once; further requests wait (0 = all cores; default: 0).",
+    )
+    p_serve.add_argument("--quiet", action="store_true", help="Don't log each request.")
+
     args = parser.parse_args(argv)
 
     # Default: GUI
@@ -38,6 +158,12 @@ def main(argv=None) -> int:
             scan_file_for_hits,
             default_csv_report_path_in_dir,
             write_csv_report,
+            write_csv_report_streaming,
+            get_cached_encoding,
+            iter_hits,
+            OperationSummary,
+            operation_summary_path_for_report,
+            write_operation_summary_csv,
         )
 
         input_path = os.path.abspath(args.input)
@@ -48,37 +174,276 @@ def main(argv=None) -> int:
         if not os.path.isdir(outdir):
             raise SystemExit(f"Output directory not found: {outdir}")
 
-        # Use defaults from config, but allow CLI overrides
-        cfg = AppConfig.load()
-
-        target_text = args.target if args.target is not None else cfg.target_text
-        parent_text = args.parent if args.parent is not None else cfg.parent_text
-        use_parent = False if args.no_parent else cfg.use_parent
-        op_no_text = args.opno if args.opno is not None else cfg.op_no_text
-        tool_change_text = args.toolchg if args.toolchg is not None else cfg.tool_change_text
-        case_sensitive = True if args.case else cfg.case_sensitive
-
-        if not target_text:
-            raise SystemExit("Target text cannot be blank (use --target or set it in config).")
-
-        rows, total_hits = scan_file_for_hits(
-            input_path,
-            target_text,
-            parent_text,
-            use_parent,
-            op_no_text,
-            tool_change_text,
-            case_sensitive,
-        )
-
+        search = _resolve_search_args(args, AppConfig.load())
         report_path = default_csv_report_path_in_dir(input_path, outdir)
-        write_csv_report(report_path, rows, total_hits)
+        summary = OperationSummary() if (args.summary or args.summary_only) else None
+        summary_path = operation_summary_path_for_report(report_path)
+
+        if args.incremental:
+            from .mcd_hunter_incremental import scan_file_incremental
+
+            search.pop("backend")
+            try:
+                rows, all_hits, resumed = scan_file_incremental(input_path, **search)
+            except ValueError as e:
+                raise SystemExit(str(e))
+            total_hits = len(rows)
+            print(("Resumed previous scan" if resumed else "Scanned from the start") + f"; hits in file so far: {all_hits}")
+        elif args.use_index:
+            from .mcd_hunter_index import scan_file_for_hits_indexed
+
+            search.pop("backend")
+            rows, total_hits, used_index = scan_file_for_hits_indexed(input_path, **search)
+            print("Context index: " + ("used" if used_index else "built"))
+        elif args.stream or args.summary_only:
+            rows = iter_hits(input_path, **search, workers=_worker_count(args.workers))
+        else:
+            rows, total_hits = scan_file_for_hits(
+                input_path,
+                **search,
+                workers=_worker_count(args.workers),
+            )
+
+        if summary is not None:
+            rows = summary.observe(rows)
+
+        if args.summary_only:
+            total_hits = sum(1 for _ in rows)  # hits are only aggregated, not kept
+            report_path = None
+        elif args.db is not None:
+            from .mcd_hunter_db import open_report_db, append_scan_to_db
+
+            conn = open_report_db(args.db or None)
+            try:
+                scan_id, total_hits = append_scan_to_db(conn, input_path, rows, search)
+            finally:
+                conn.close()
+            report_path = f"{args.db or 'report database'} (scan id {scan_id})"
+        elif args.format != "csv":
+            from .mcd_hunter_columnar import write_columnar_report
+
+            report_path = os.path.splitext(report_path)[0] + "." + args.format
+            try:
+                total_hits = write_columnar_report(report_path, rows, args.format, {"input_path": input_path})
+            except RuntimeError as e:
+                raise SystemExit(str(e))
+        elif args.stream:
+            total_hits = write_csv_report_streaming(report_path, rows, {"input_path": input_path})
+        else:
+            write_csv_report(report_path, rows, total_hits)
+
+        if summary is not None:
+            write_operation_summary_csv(summary_path, summary)
 
         if args.print_report_path:
-            print(report_path)
+            print(report_path or summary_path)
 
-        print(f"Complete. Report created: {report_path}")
+        if report_path is not None:
+            print(f"Complete. Report created: {report_path}")
+        else:
+            print("Complete.")
+        if summary is not None:
+            print(f"Operation summary: {summary_path} ({len(summary)} operations)")
         print(f"Total hits: {total_hits}")
+
+        encoding = get_cached_encoding(input_path)
+        if encoding is not None:
+            print(f"Encoding: {encoding.describe()}")
+        return 0
+
+    if args.cmd == "batch":
+        from .mcd_hunter_core import AppConfig
+        from .mcd_hunter_batch import collect_input_files, run_batch
+
+        outdir = os.path.abspath(args.outdir)
+        if not os.path.isdir(outdir):
+            raise SystemExit(f"Output directory not found: {outdir}")
+
+        search = _resolve_search_args(args, AppConfig.load())
+
+        input_paths = collect_input_files(args.inputs, args.file_list, args.recursive)
+        if not input_paths:
+            raise SystemExit("No input files found.")
+
+        result = run_batch(
+            input_paths,
+            outdir,
+            search,
+            workers=_worker_count(args.workers),
+            combined=args.combined,
+            db_path=args.db,
+        )
+
+        summary = result["summary"]
+        for path, error in result["failures"]:
+            print(f"FAILED: {path}: {error}")
+
+        if args.db is not None:
+            print(f"Complete. Scans recorded in {args.db or 'report database'}: {summary.files - summary.failed}")
+        else:
+            print(f"Complete. Report(s) written: {len(result['reports'])}")
+        if args.combined and result["reports"]:
+            print(f"Combined report: {result['reports'][0]}")
+        print(f"Total hits: {summary.total_hits}")
+        print(summary.throughput_text())
+        return 1 if summary.failed else 0
+
+    if args.cmd == "watch":
+        from .mcd_hunter_core import AppConfig
+        from .mcd_hunter_watch import watch_directory
+
+        watch_dir = os.path.abspath(args.directory)
+        outdir = os.path.abspath(args.outdir)
+        if not os.path.isdir(watch_dir):
+            raise SystemExit(f"Watch directory not found: {watch_dir}")
+        if not os.path.isdir(outdir):
+            raise SystemExit(f"Output directory not found: {outdir}")
+
+        search = _resolve_search_args(args, AppConfig.load())
+
+        def on_result(result):
+            if result.error:
+                print(f"FAILED: {result.input_path}: {result.error}", flush=True)
+            elif result.skipped:
+                print(f"Skipped (content already scanned): {result.input_path}", flush=True)
+            else:
+                print(f"{result.input_path}: {result.total_hits} hit(s) -> {result.report_path}", flush=True)
+
+        print(f"Watching {watch_dir} (Ctrl+C to stop)", flush=True)
+        scanned = watch_directory(
+            watch_dir,
+            outdir,
+            search,
+            workers=_worker_count(args.workers),
+            settle_s=args.settle,
+            patterns=args.pattern,
+            include_existing=args.existing,
+            poll=args.poll,
+            poll_interval_s=args.poll_interval,
+            on_result=on_result,
+        )
+        print(f"Stopped. Files scanned: {scanned}")
+        return 0
+
+    if args.cmd == "serve":
+        from .mcd_hunter_server import make_scan_server, remove_socket_file
+
+        try:
+            server = make_scan_server(args.port, args.unix, _worker_count(args.max_scans), quiet=args.quiet)
+        except (OSError, RuntimeError) as e:
+            raise SystemExit(f"Cannot start server: {e}")
+
+        where = args.unix if args.unix else "http://%s:%d" % server.server_address[:2]
+        print(f"Serving on {where} (POST /scan, GET /health; Ctrl+C to stop)", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            if args.unix:
+                try:
+                    remove_socket_file(args.unix)
+                except OSError:
+                    pass  # replaced by something else meanwhile; not ours to delete
+        print("Stopped.")
         return 0
 
     return 0
+
+
+def _add_search_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument(
+        "--target",
+        action="append",
+        default=None,
+        help="Target (child) search text; repeat to hunt several targets in one pass.",
+    )
+    p.add_argument("--parent", default=None, help="Parent search text.")
+    p.add_argument("--no-parent", action="store_true", help="Disable parent lookup.")
+    p.add_argument("--opno", default=None, help="Operation number search text.")
+    p.add_argument("--toolchg", default=None, help="Tool change search text.")
+    p.add_argument("--case", action="store_true", help="Case sensitive search.")
+    p.add_argument(
+        "--regex",
+        action="store_true",
+        help="Treat target and tracker texts as regular expressions (runs on the text engine).",
+    )
+    p.add_argument(
+        "--context-before",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Add the N lines before each hit to its row (default: from config, else 0).",
+    )
+    p.add_argument(
+        "--context-after",
+        type=int,
+        default=None,
+        metavar="M",
+        help="Add the M lines after each hit to its row (default: from config, else 0).",
+    )
+    p.add_argument(
+        "--backend",
+        choices=("auto", "text", "bytes", "mmap"),
+        default="auto",
+        help="Scan engine: 'bytes' only decodes matching lines, 'text' decodes every line (default: auto).",
+    )
+
+
+def _resolve_search_args(args: argparse.Namespace, cfg) -> dict:
+    """Search settings for scan_file_for_hits(): config defaults with CLI overrides."""
+    from .mcd_hunter_core import normalize_targets, build_tracker_matcher
+
+    targets = normalize_targets(args.target) if args.target is not None else cfg.targets()
+    if not targets:
+        raise SystemExit("Target text cannot be blank (use --target or set it in config).")
+
+    search = {
+        # A lone target stays a plain string (keeps incremental state keys stable)
+        "target_text": targets[0] if len(targets) == 1 else targets,
+        "parent_text": args.parent if args.parent is not None else cfg.parent_text,
+        "use_parent": False if args.no_parent else cfg.use_parent,
+        "op_no_text": args.opno if args.opno is not None else cfg.op_no_text,
+        "tool_change_text": args.toolchg if args.toolchg is not None else cfg.tool_change_text,
+        "case_sensitive": True if args.case else cfg.case_sensitive,
+        "use_regex": True if args.regex else cfg.use_regex,
+        "context_before": args.context_before if args.context_before is not None else cfg.context_before,
+        "context_after": args.context_after if args.context_after is not None else cfg.context_after,
+        "backend": args.backend,
+    }
+    if search["context_before"] < 0 or search["context_after"] < 0:
+        raise SystemExit("Context line counts cannot be negative.")
+
+    if search["backend"] in ("bytes", "mmap"):
+        needles = [
+            *targets,
+            search["parent_text"] if search["use_parent"] else "",
+            search["op_no_text"],
+            search["tool_change_text"],
+        ]
+        if not all(n.isascii() for n in needles):
+            raise SystemExit(f"The {search['backend']} backend requires ASCII search text (use --backend text or auto).")
+
+    if search["use_regex"]:
+        if search["backend"] in ("bytes", "mmap"):
+            raise SystemExit(f"The {search['backend']} backend does not support --regex.")
+        try:
+            # Compile the patterns up front so a typo fails before the scan starts
+            build_tracker_matcher(
+                search["target_text"],
+                search["parent_text"],
+                search["use_parent"],
+                search["op_no_text"],
+                search["tool_change_text"],
+                search["case_sensitive"],
+                use_regex=True,
+            )
+        except ValueError as e:
+            raise SystemExit(str(e))
+
+    return search
+
+
+def _worker_count(requested: int) -> int:
+    return requested if requested > 0 else (os.cpu_count() or 1)
@@ -0,0 +1,213 @@
+"""
+MCD Target Hunter - Batch Runner
+
+Purpose:
+    Scan many CNC/MCD output files (a directory, glob patterns or a list of
+    paths) across a process pool and write either one combined CSV report
+    or one report per file.
+
+Output(s):
+    - CSV file(s)
+
+Notes:
+    - Each file is scanned sequentially inside its worker; parallelism comes
+      from scanning several files at once
+    - Files that fail to scan are reported and skipped, the rest still run
+"""
+
+import csv
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import List, Optional, Dict, Any, Iterable, Iterator
+
+from .mcd_hunter_core import (
+    CSV_FIELDNAMES,
+    scan_file_for_hits,
+    default_csv_report_path_in_dir,
+    write_csv_report,
+)
+
+
+@dataclass
+class BatchResult:
+    input_path: str
+    size_bytes: int = 0
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    total_hits: int = 0
+    error: str = ""
+
+
+@dataclass
+class BatchSummary:
+    files: int = 0
+    failed: int = 0
+    total_bytes: int = 0
+    total_hits: int = 0
+    elapsed_s: float = 0.0
+
+    def throughput_text(self) -> str:
+        secs = max(self.elapsed_s, 1e-9)
+        mb = self.total_bytes / (1024 * 1024)
+        return (
+            f"Scanned {self.files} file(s), {mb:.1f} MB in {self.elapsed_s:.2f}s "
+            f"({mb / secs:.1f} MB/s, {self.files / secs:.1f} files/s)"
+        )
+
+
+def _has_glob_magic(text: str) -> bool:
+    return any(c in text for c in "*?[")
+
+
+def collect_input_files(
+    inputs: Iterable[str],
+    file_list: Optional[str] = None,
+    recursive: bool = False,
+) -> List[str]:
+    """
+    Expands directories, glob patterns and an optional file list (one path
+    per line, blank lines and '#' comments ignored) into a sorted list of
+    unique absolute file paths.
+    """
+    specs = list(inputs)
+    if file_list:
+        with open(file_list, "r", encoding="utf-8") as f:
+            specs.extend(s.strip() for s in f if s.strip() and not s.lstrip().startswith("#"))
+
+    found = set()
+    for spec in specs:
+        if _has_glob_magic(spec):
+            matches = glob.glob(spec, recursive=recursive)
+        elif os.path.isdir(spec):
+            if recursive:
+                matches = [os.path.join(d, n) for d, _, names in os.walk(spec) for n in names]
+            else:
+                matches = [os.path.join(spec, n) for n in os.listdir(spec)]
+        else:
+            # Explicit paths are kept even if missing so they show up as failures
+            found.add(os.path.abspath(spec))
+            continue
+
+        found.update(os.path.abspath(m) for m in matches if os.path.isfile(m))
+
+    return sorted(found)
+
+
+def _scan_one(input_path: str, scan_kwargs: Dict[str, Any]) -> BatchResult:
+    """Process-pool worker: scans a single file, capturing errors instead of raising."""
+    result = BatchResult(input_path)
+    try:
+        result.size_bytes = os.path.getsize(input_path)
+        result.rows, result.total_hits = scan_file_for_hits(input_path, **scan_kwargs)
+    except Exception as e:
+        result.error = str(e) or e.__class__.__name__
+    return result
+
+
+def iter_batch_scan(
+    input_paths: List[str],
+    scan_kwargs: Dict[str, Any],
+    workers: int = 1,
+) -> Iterator[BatchResult]:
+    """
+    Scans input_paths with up to `workers` processes and yields one
+    BatchResult per file, in input order. scan_kwargs are passed to
+    scan_file_for_hits().
+    """
+    if workers <= 1 or len(input_paths) <= 1:
+        for path in input_paths:
+            yield _scan_one(path, scan_kwargs)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_scan_one, input_paths, repeat(scan_kwargs))
+
+
+def _unique_path(path: str) -> str:
+    if not os.path.exists(path):
+        return path
+    base, ext = os.path.splitext(path)
+    n = 2
+    while os.path.exists(f"{base}_{n}{ext}"):
+        n += 1
+    return f"{base}_{n}{ext}"
+
+
+def default_batch_report_path_in_dir(output_dir: str) -> str:
+    ts = time.strftime("%Y%m%d_%H%M%S")
+    return _unique_path(os.path.join(output_dir, f"Batch_MCDTargetHunter_{ts}.csv"))
+
+
+def run_batch(
+    input_paths: List[str],
+    output_dir: str,
+    scan_kwargs: Dict[str, Any],
+    workers: int = 1,
+    combined: bool = False,
+    db_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Scans every file and writes the reports.
+
+    combined=True writes one CSV with a leading source_file column (total_hits
+    is per file); otherwise each file gets its own timestamped report.
+    db_path (None = off, "" = default database) appends every scan to the
+    SQLite report database instead of writing CSVs.
+
+    Returns {"summary": BatchSummary, "reports": [...], "failures": [(path, error), ...]}.
+    """
+    summary = BatchSummary()
+    reports: List[str] = []
+    failures: List[tuple] = []
+    started = time.perf_counter()
+
+    conn = None
+    combined_file = None
+    combined_writer = None
+    if db_path is not None:
+        from .mcd_hunter_db import open_report_db
+        conn = open_report_db(db_path or None)
+    elif combined:
+        combined_path = default_batch_report_path_in_dir(output_dir)
+        combined_file = open(combined_path, "w", newline="", encoding="utf-8")
+        combined_writer = csv.DictWriter(combined_file, fieldnames=["source_file", *CSV_FIELDNAMES])
+        combined_writer.writeheader()
+        reports.append(combined_path)
+
+    try:
+        for result in iter_batch_scan(input_paths, scan_kwargs, workers):
+            summary.files += 1
+            summary.total_bytes += result.size_bytes
+
+            if result.error:
+                summary.failed += 1
+                failures.append((result.input_path, result.error))
+                continue
+
+            summary.total_hits += result.total_hits
+
+            if conn is not None:
+                from .mcd_hunter_db import append_scan_to_db
+                append_scan_to_db(conn, result.input_path, result.rows, scan_kwargs)
+            elif combined_writer is not None:
+                for r in result.rows:
+                    combined_writer.writerow({
+                        "source_file": result.input_path,
+                        "total_hits": result.total_hits,
+                        **r,
+                    })
+            else:
+                report_path = _unique_path(default_csv_report_path_in_dir(result.input_path, output_dir))
+                write_csv_report(report_path, result.rows, result.total_hits)
+                reports.append(report_path)
+    finally:
+        if combined_file is not None:
+            combined_file.close()
+        if conn is not None:
+            conn.close()
+
+    summary.elapsed_s = time.perf_counter() - started
+    return {"summary": summary, "reports": reports, "failures": failures}
@@ -0,0 +1,111 @@
+"""
+MCD Target Hunter - Columnar Report Output
+
+Purpose:
+    Write the hit table as Parquet or Arrow IPC (Feather v2) instead of CSV,
+    for analysis notebooks that would otherwise re-parse large CSVs.
+
+Output(s):
+    - .parquet / .arrow file
+
+Notes:
+    - Optional: requires pyarrow (pip install "mcdtargethunter[columnar]")
+    - Context columns are dictionary-encoded straight from the ContextTable,
+      so each distinct operation / tool line is stored once
+    - The total hit count and input path are stored in the schema metadata
+"""
+
+from typing import List, Optional, Dict, Any, Iterable
+
+from .mcd_hunter_core import ContextTable, iter_hit_records
+
+COLUMNAR_FORMATS = ("parquet", "arrow")
+
+# Rows per Parquet row group; small enough for useful min/max statistics
+# (predicate pushdown on line_number / operation / tool), large enough to
+# keep the file compact
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise RuntimeError(
+            "Parquet / Arrow output needs the optional 'pyarrow' package "
+            "(pip install pyarrow)."
+        ) from None
+    return pyarrow
+
+
+def write_columnar_report(
+    report_path: str,
+    rows: Iterable[Dict[str, Any]],
+    fmt: str = "parquet",
+    metadata: Optional[Dict[str, str]] = None,
+) -> int:
+    """
+    Writes rows (e.g. from iter_hits()) as a Parquet or Arrow IPC file.
+
+    Rows are converted to compact records as they arrive, so memory holds
+    only integer columns, the target lines and one copy of each context
+    line. Returns the number of rows written.
+    """
+    if fmt not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown columnar format: {fmt!r} (expected one of {', '.join(COLUMNAR_FORMATS)})")
+    pa = _require_pyarrow()
+
+    table = ContextTable()
+    hit_index: List[int] = []
+    line_number: List[int] = []
+    target_text: List[str] = []
+    target_line: List[str] = []
+    context_ids: Dict[str, List[int]] = {
+        "operation_no_line": [],
+        "tool_number_line": [],
+        "tool_change_line": [],
+        "parent_line": [],
+    }
+    numbers: Dict[str, List[Optional[int]]] = {"operation_no": [], "tool_number": [], "n_block": []}
+    around: Dict[str, List[Optional[str]]] = {"context_before": [], "context_after": []}
+
+    for rec in iter_hit_records(rows, table):
+        hit_index.append(rec.hit_index)
+        line_number.append(rec.line_number)
+        target_text.append(rec.target_text)
+        target_line.append(rec.target_line)
+        context_ids["operation_no_line"].append(rec.operation_no_id)
+        context_ids["tool_number_line"].append(rec.tool_number_id)
+        context_ids["tool_change_line"].append(rec.tool_change_id)
+        context_ids["parent_line"].append(rec.parent_id)
+        numbers["operation_no"].append(rec.operation_no)
+        numbers["tool_number"].append(rec.tool_number)
+        numbers["n_block"].append(rec.n_block)
+        around["context_before"].append(rec.context_before)
+        around["context_after"].append(rec.context_after)
+
+    dictionary = pa.array(table.lines, type=pa.string())
+    columns = {
+        "hit_index": pa.array(hit_index, type=pa.int64()),
+        "line_number": pa.array(line_number, type=pa.int64()),
+        "target_text": pa.array(target_text, type=pa.string()).dictionary_encode(),
+        "target_line": pa.array(target_line, type=pa.string()),
+    }
+    for name, ids in context_ids.items():
+        columns[name] = pa.DictionaryArray.from_arrays(pa.array(ids, type=pa.int32()), dictionary)
+    for name, values in numbers.items():
+        columns[name] = pa.array(values, type=pa.int64())  # nullable: None where nothing was parsed
+    for name, texts in around.items():
+        columns[name] = pa.array(texts, type=pa.string())  # null unless context lines were requested
+
+    schema_metadata = {"total_hits": str(len(hit_index)), **(metadata or {})}
+    arrow_table = pa.table(columns).replace_schema_metadata(schema_metadata)
+
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(arrow_table, report_path, row_group_size=PARQUET_ROW_GROUP_SIZE, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(arrow_table, report_path, compression="zstd")
+
+    return len(hit_index)
@@ -27,17 +27,26 @@ Version:
 
 import os
 import json
+import codecs
 import csv
+import mmap
 import re
-from dataclasses import dataclass
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple, Iterable, Iterator, Callable, NamedTuple, Sequence, Union, Deque
 
 __version__ = "1.0.0"
 
 APP_NAME = "MCD Target Hunter"
 CONFIG_DIR_NAME = "MCDTargetFinderConfig"
 CONFIG_FILE_NAME = "config.json"
+ENCODING_CACHE_FILE_NAME = "encoding_cache.json"
 
 
 def get_config_dir() -> str:
@@ -55,6 +64,8 @@ def get_config_path() -> str:
 @dataclass
 class AppConfig:
     target_text: str = "POST-GENERATED"
+    # Further targets hunted in the same pass as target_text
+    extra_target_texts: List[str] = field(default_factory=list)
     parent_text: str = "OPERATION NAME"
     use_parent: bool = True
 
@@ -62,6 +73,12 @@ class AppConfig:
     tool_change_text: str = "M06"
 
     case_sensitive: bool = False
+    # Treat every search text (targets and trackers) as a regular expression
+    use_regex: bool = False
+
+    # Lines captured around each hit (context_before / context_after columns)
+    context_before: int = 0
+    context_after: int = 0
 
     input_file_path: str = ""
     output_dir_path: str = ""
@@ -75,11 +92,15 @@ class AppConfig:
                     data = json.load(f)
                 return AppConfig(
                     target_text=data.get("target_text", "POST-GENERATED"),
+                    extra_target_texts=list(data.get("extra_target_texts", [])),
                     parent_text=data.get("parent_text", "OPERATION NAME"),
                     use_parent=bool(data.get("use_parent", True)),
                     op_no_text=data.get("op_no_text", "OPERATION NO. ="),
                     tool_change_text=data.get("tool_change_text", "M06"),
                     case_sensitive=bool(data.get("case_sensitive", False)),
+                    use_regex=bool(data.get("use_regex", False)),
+                    context_before=int(data.get("context_before", 0)),
+                    context_after=int(data.get("context_after", 0)),
                     input_file_path=data.get("input_file_path", ""),
                     output_dir_path=data.get("output_dir_path", ""),
                 )
@@ -87,30 +108,492 @@ class AppConfig:
             pass
         return AppConfig()
 
+    def targets(self) -> List[str]:
+        return normalize_targets([self.target_text, *self.extra_target_texts])
+
     def save(self) -> None:
         os.makedirs(get_config_dir(), exist_ok=True)
         with open(get_config_path(), "w", encoding="utf-8") as f:
             json.dump(self.__dict__, f, indent=2)
 
 
+READ_CHUNK_BYTES = 1 << 20
+
+# Characters str.splitlines() treats as line boundaries
+_LINE_BREAK_CHARS = frozenset("\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029")
+
+
+def _split_chunked_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Re-assembles lines from arbitrary text chunks with the same line
+    boundaries as str.splitlines(), holding back only the trailing partial
+    line (and a trailing '\r' that may be the first half of '\r\n').
+    """
+    carry = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buf = carry + chunk
+        lines = buf.splitlines()
+        last = buf[-1]
+        if last == "\r":
+            carry = lines.pop() + "\r"
+        elif last in _LINE_BREAK_CHARS:
+            carry = ""
+        else:
+            carry = lines.pop()
+        yield from lines
+    if carry:
+        yield from carry.splitlines()
+
+
+@dataclass(frozen=True)
+class DetectedEncoding:
+    """
+    Result of the single-pass encoding probe.
+
+    encoding is "utf-8" or "cp1252". With whole_file=True (text engine) the
+    whole file was decoded: for cp1252, fallback_offset is the byte offset
+    of the first invalid UTF-8 sequence; bytes before it were decoded as
+    UTF-8, everything from it onward as cp1252.
+
+    whole_file=False comes from the bytes engine, which only decodes the
+    lines it reports (each on its own): "cp1252" then means at least one of
+    them was not valid UTF-8.
+    """
+    encoding: str
+    fallback_offset: Optional[int] = None
+    whole_file: bool = True
+
+    def describe(self) -> str:
+        if not self.whole_file:
+            return "utf-8 (decoded lines)" if self.encoding == "utf-8" else "mixed (cp1252 lines seen)"
+        if self.fallback_offset:
+            return f"cp1252 (utf-8 up to byte {self.fallback_offset:,})"
+        return self.encoding
+
+
+# Entries kept in the encoding cache file (most recently stored win)
+ENCODING_CACHE_MAX_ENTRIES = 256
+
+_encoding_cache_lock = threading.Lock()
+
+
+def get_encoding_cache_path() -> str:
+    return os.path.join(get_config_dir(), ENCODING_CACHE_FILE_NAME)
+
+
+def _file_cache_key(path: str) -> Tuple[str, int, int]:
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+def _load_encoding_cache() -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(get_encoding_cache_path(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _lookup_encoding(key: Tuple[str, int, int]) -> Optional[DetectedEncoding]:
+    path, size, mtime_ns = key
+    with _encoding_cache_lock:
+        entry = _load_encoding_cache().get(path)
+    if not isinstance(entry, dict) or entry.get("size") != size or entry.get("mtime_ns") != mtime_ns:
+        return None
+    try:
+        return DetectedEncoding(entry["encoding"], entry.get("fallback_offset"), bool(entry.get("whole_file", True)))
+    except (KeyError, TypeError):
+        return None
+
+
+def _store_encoding(key: Tuple[str, int, int], detected: DetectedEncoding) -> None:
+    """
+    Records detected for the file version in key, in the per-user cache file
+    (bounded to ENCODING_CACHE_MAX_ENTRIES files). A bytes-engine result
+    never replaces a whole-file one for the same file version. Best effort:
+    write errors are ignored.
+    """
+    path, size, mtime_ns = key
+    entry = {
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "encoding": detected.encoding,
+        "fallback_offset": detected.fallback_offset,
+        "whole_file": detected.whole_file,
+    }
+    with _encoding_cache_lock:
+        cache = _load_encoding_cache()
+        old = cache.pop(path, None)
+        if isinstance(old, dict) and old.get("size") == size and old.get("mtime_ns") == mtime_ns:
+            if old.get("whole_file", True) and not detected.whole_file:
+                entry = old
+            if entry == old and len(cache) < ENCODING_CACHE_MAX_ENTRIES:
+                return  # unchanged
+        cache[path] = entry  # (re)inserted last = newest
+        while len(cache) > ENCODING_CACHE_MAX_ENTRIES:
+            del cache[next(iter(cache))]
+        _write_encoding_cache(cache)
+
+
+def _forget_encoding(key: Tuple[str, int, int]) -> None:
+    """Drops the cache entry for key's file version (e.g. found stale)."""
+    path, size, mtime_ns = key
+    with _encoding_cache_lock:
+        cache = _load_encoding_cache()
+        old = cache.get(path)
+        if isinstance(old, dict) and old.get("size") == size and old.get("mtime_ns") == mtime_ns:
+            del cache[path]
+            _write_encoding_cache(cache)
+
+
+def _write_encoding_cache(cache: Dict[str, Dict[str, Any]]) -> None:
+    # Callers hold _encoding_cache_lock
+    cache_path = get_encoding_cache_path()
+    tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def get_cached_encoding(path: str) -> Optional[DetectedEncoding]:
+    """
+    Returns the encoding recorded by the last complete scan of this file (in
+    this or an earlier run), if the file is unchanged since.
+    """
+    try:
+        return _lookup_encoding(_file_cache_key(path))
+    except OSError:
+        return None
+
+
+def _iter_decoded_chunks(
+    f,
+    detected: Dict[str, Any],
+    fallback_offset: Optional[int] = None,
+    advance: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """
+    Decodes a binary file object in one pass. Starts as UTF-8 and switches to
+    cp1252 (errors replaced) at the first invalid byte, without going back
+    to the start of the file.
+
+    If fallback_offset is already known (from the cache), the switch happens
+    at that byte offset without probing, provided the bytes there are still
+    invalid UTF-8. If not, probing carries on as if nothing was cached, and
+    if the bytes show the file changed under the cache entry, detected gets
+    "stale" = True.
+    advance, if given, is called with the number of bytes read so far after
+    each chunk.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    offset = 0
+
+    while True:
+        raw = f.read(READ_CHUNK_BYTES)
+        final = not raw
+        data = raw
+
+        if fallback_offset is not None and offset + len(raw) >= fallback_offset:
+            # Replaying a cached detection: split the chunk at the known offset
+            cut = fallback_offset - offset
+            state = decoder.getstate()
+            try:
+                head = decoder.decode(raw[:cut], True)
+                invalid = _utf8_invalid_at_start(raw[cut:])
+            except UnicodeDecodeError:
+                invalid = False
+            if invalid:
+                if head:
+                    yield head
+                detected["fallback_offset"] = fallback_offset
+                decoder = codecs.getincrementaldecoder("cp1252")(errors="replace")
+                data = raw[cut:]
+            else:
+                decoder.setstate(state)
+                if invalid is not None:
+                    detected["stale"] = True
+            fallback_offset = None
+
+        if "fallback_offset" not in detected:
+            try:
+                text = decoder.decode(data, final)
+            except UnicodeDecodeError as e:
+                # e.object is the decoder's buffered tail + this chunk
+                buffered = len(e.object) - len(data)
+                detected["fallback_offset"] = offset - buffered + e.start
+                head = e.object[:e.start].decode("utf-8")
+                if head:
+                    yield head
+                decoder = codecs.getincrementaldecoder("cp1252")(errors="replace")
+                text = decoder.decode(e.object[e.start:], final)
+        else:
+            text = decoder.decode(data, final)
+
+        offset += len(raw)
+        if advance is not None:
+            advance(offset)
+        if text:
+            yield text
+        if final:
+            return
+
+
+def _utf8_invalid_at_start(data: bytes) -> Optional[bool]:
+    """
+    True if data starts with bytes that are never valid UTF-8, False if it
+    starts with a valid character, None if it is too short to tell.
+    """
+    try:
+        text = codecs.getincrementaldecoder("utf-8")().decode(data[:4])
+    except UnicodeDecodeError as e:
+        return e.start == 0
+    return False if text else None
+
+
+def iter_text_file_lines(path: str, advance: Optional[Callable[[int], None]] = None) -> Iterator[str]:
+    """
+    Streaming counterpart of read_text_file_lines().
+
+    Yields lines without holding the whole file in memory and reads the
+    file exactly once. UTF-8 is assumed until the first invalid byte, after
+    which the rest of the file is decoded as cp1252 (see DetectedEncoding).
+    Once the file has been read to the end, the detected encoding is
+    recorded in the per-user encoding cache for get_cached_encoding() and
+    for the next read of the same file (also by later runs).
+    """
+    key = _file_cache_key(path)
+    cached = _lookup_encoding(key)
+    fallback_offset = cached.fallback_offset if cached is not None and cached.whole_file else None
+    detected: Dict[str, Any] = {}
+
+    try:
+        with open(path, "rb") as f:
+            chunks = _iter_decoded_chunks(f, detected, fallback_offset, advance)
+            yield from _split_chunked_lines(chunks)
+    finally:
+        if detected.get("stale"):
+            _forget_encoding(key)
+
+    fallback = detected.get("fallback_offset")
+    _store_encoding(key, DetectedEncoding("cp1252" if fallback is not None else "utf-8", fallback))
+
+
 def read_text_file_lines(path: str) -> List[str]:
+    return list(iter_text_file_lines(path))
+
+
+# Tracker bits reported by TrackerMatcher.match()
+TRACK_PARENT = 1 << 0
+TRACK_OP_NO = 1 << 1
+TRACK_TOOL_CHANGE = 1 << 2
+TRACK_TARGET = 1 << 3
+TRACK_TOOL_NUMBER = 1 << 4  # regex tracker, reported by the bytes engine's on_context hook
+_CONTEXT_BITS = TRACK_PARENT | TRACK_OP_NO | TRACK_TOOL_CHANGE | TRACK_TOOL_NUMBER
+
+# Target i fires TRACK_TARGET plus its own bit (1 << (_TARGET_SHIFT + i))
+_TARGET_SHIFT = 8
+
+# One target string, or several hunted in the same pass
+Targets = Union[str, Sequence[str]]
+
+
+def normalize_targets(target_text: Targets) -> List[str]:
+    """Distinct non-blank targets, in the order given."""
+    if isinstance(target_text, str):
+        target_text = [target_text]
+    return list(dict.fromkeys(t for t in target_text if t))
+
+
+def _target_needles(targets: List[str]) -> List[Tuple[int, str]]:
+    return [(TRACK_TARGET | (1 << (_TARGET_SHIFT + i)), t) for i, t in enumerate(targets)]
+
+
+def _matched_targets(fired: int, targets: List[str]) -> List[str]:
+    """The configured targets that fired on the line, in the order given."""
+    bits = fired >> _TARGET_SHIFT
+    return [target for i, target in enumerate(targets) if bits >> i & 1]
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str, flags: int = 0) -> "re.Pattern[str]":
+    """
+    Compiles a search pattern, cached by (pattern, flags) so repeated scans
+    with the same settings (e.g. GUI re-runs) reuse the compiled object.
+
+    Raises ValueError for an invalid pattern.
+    """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return f.read().splitlines()
-    except UnicodeDecodeError:
-        with open(path, "r", encoding="cp1252", errors="replace") as f:
-            return f.read().splitlines()
+        return re.compile(pattern, flags)
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression {pattern!r}: {e}") from None
+
+
+# Patterns that change meaning when lowercased: class ranges starting at an
+# uppercase letter ([A-z]) and inline flags ((?-i:...))
+_UNSAFE_TO_LOWER = re.compile(r"\[[^\]]*[A-Z]-|\(\?[aiLmsux-]+[:)]")
 
+# Escapes that mean the same once lowercased: escaped punctuation plus these
+# lowercase class / control escapes. Every other escape may stand for an
+# uppercase letter (\x50, \u0050, \120, \N{...}) or flip meaning (\D, \W,
+# \B, \A, \Z, ...)
+_ESCAPE = re.compile(r"\\(.)", re.DOTALL)
+_LOWERCASE_SAFE_ESCAPES = frozenset("dswbntrfva")
 
-def _contains(haystack: str, needle: str, case_sensitive: bool) -> bool:
-    if not needle:
+# Numbered backreferences / conditionals would point at the wrong group once
+# patterns are combined into one alternation
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?\(")
+
+
+def _lowercase_safe(pattern: str) -> bool:
+    """True if pattern.lower() matches every lowercased line the IGNORECASE pattern matches."""
+    if not pattern.isascii() or _UNSAFE_TO_LOWER.search(pattern) is not None:
         return False
-    return needle in haystack if case_sensitive else needle.lower() in haystack.lower()
+    return all(not c.isalnum() or c in _LOWERCASE_SAFE_ESCAPES for c in _ESCAPE.findall(pattern))
+
+
+class TrackerMatcher:
+    """
+    Matches a line against every configured needle at once.
+
+    Each needle is registered under a tracker bit; match() returns the OR of
+    the bits whose needle occurs in the line. The line is lowercased once per
+    call (case-insensitive mode) and screened with a single compiled
+    alternation of all needles, so the common "nothing matches" line costs
+    one regex search no matter how many trackers are configured. Only lines
+    that pass the screen are checked needle by needle.
+
+    With regex=True the needles are regular expressions (searched, not
+    anchored; IGNORECASE instead of lowercasing). The screen is then the
+    alternation of the patterns and each pattern is compiled once.
+    """
 
+    def __init__(self, needles: Iterable[Tuple[int, str]], case_sensitive: bool = False, regex: bool = False):
+        self.case_sensitive = case_sensitive
+        self.regex = regex
 
-def _tool_number_match(line: str, case_sensitive: bool) -> bool:
+        if regex:
+            flags = 0 if case_sensitive else re.IGNORECASE
+            patterns = [(bit, pattern) for bit, pattern in needles if pattern]
+            self._patterns = [(bit, compile_pattern(p, flags).search) for bit, p in patterns]
+            alternatives = list(dict.fromkeys(p for _, p in patterns))
+
+            # IGNORECASE matching is several times slower than a plain regex, so
+            # when every pattern survives lowercasing the screen runs lowercased
+            self._screen_lower = not case_sensitive and all(_lowercase_safe(p) for p in alternatives)
+            self._screen = None
+            if alternatives and (len(alternatives) > 1 or self._screen_lower) and not any(
+                _BACKREFERENCE.search(p) for p in alternatives
+            ):
+                screen = "|".join(f"(?:{p})" for p in alternatives)
+                try:
+                    self._screen = (
+                        compile_pattern(screen.lower()) if self._screen_lower else compile_pattern(screen, flags)
+                    ).search
+                except ValueError:
+                    pass  # e.g. a group name used twice; check pattern by pattern instead
+            return
+
+        self._needles: List[Tuple[int, str]] = [
+            (bit, needle if case_sensitive else needle.lower())
+            for bit, needle in needles
+            if needle
+        ]
+
+        # Longest first so overlapping needles don't shadow each other in the screen
+        alternatives = sorted({n for _, n in self._needles}, key=len, reverse=True)
+        self._screen = re.compile("|".join(re.escape(n) for n in alternatives)).search if alternatives else None
+
+    def match(self, line: str) -> int:
+        if self.regex:
+            return self._match_regex(line)
+        if self._screen is None:
+            return 0
+        if not self.case_sensitive:
+            line = line.lower()
+        if self._screen(line) is None:
+            return 0
+
+        mask = 0
+        for bit, needle in self._needles:
+            if needle in line:
+                mask |= bit
+        return mask
+
+    def _match_regex(self, line: str) -> int:
+        if self._screen is not None and self._screen(line.lower() if self._screen_lower else line) is None:
+            return 0
+
+        mask = 0
+        for bit, search in self._patterns:
+            if search(line) is not None:
+                mask |= bit
+        return mask
+
+
+def build_tracker_matcher(
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    use_regex: bool = False,
+) -> TrackerMatcher:
+    """
+    Matcher for the given search settings. Matchers hold no per-scan state,
+    so they are cached and shared by every scan with the same settings (e.g.
+    repeated requests to the scan server).
+    """
+    return _cached_tracker_matcher(
+        tuple(normalize_targets(target_text)),
+        parent_text if use_parent else "",
+        op_no_text,
+        tool_change_text,
+        case_sensitive,
+        use_regex,
+    )
+
+
+@lru_cache(maxsize=64)
+def _cached_tracker_matcher(
+    targets: Tuple[str, ...],
+    parent_text: str,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool,
+    use_regex: bool,
+) -> TrackerMatcher:
+    needles = [
+        (TRACK_PARENT, parent_text),
+        (TRACK_OP_NO, op_no_text),
+        (TRACK_TOOL_CHANGE, tool_change_text),
+        *_target_needles(list(targets)),
+    ]
+    return TrackerMatcher(needles, case_sensitive, use_regex)
+
+
+# One alternation per supported style; exactly one group captures the number
+_TOOL_NUMBER_PATTERN = (
+    r"\bT\s*[=#]?\s*\"?\s*(\d+)\b"  # T10, T 10, T=10, T#10, T="10"
+    r"|\bTOOL\s*(?:NO\.?)?\s*[=:]?\s*(\d+)\b"  # TOOL 10, TOOL NO 10, TOOL NO. 10
+    r"|\bTOOL\s*CALL\s*(\d+)\b"  # TOOL CALL 10
+)
+
+
+def compile_tool_number_parser(case_sensitive: bool) -> Callable[[str], Optional[int]]:
     """
-    Tries to match a 'tool number' in many common NC/post styles.
+    Compiles the tool-number recognizer once and returns a function that
+    parses the tool number out of a line, or None if the line has none.
 
     Matches examples:
       - N52300 T10
@@ -121,97 +604,1176 @@ def _tool_number_match(line: str, case_sensitive: bool) -> bool:
       - N52300 TOOL 10
       - N52300 TOOL NO. 10
       - N52300 TOOL CALL 10
+
+    Every style starts with 'T', so lines without one are rejected before the
+    regex runs.
     """
-    if not line:
-        return False
+    search = re.compile(_TOOL_NUMBER_PATTERN, 0 if case_sensitive else re.IGNORECASE).search
 
-    re_flags = 0 if case_sensitive else re.IGNORECASE
+    if case_sensitive:
+        def parse(line: str) -> Optional[int]:
+            if "T" not in line:
+                return None
+            m = search(line)
+            return int(m.group(m.lastindex)) if m else None
+    else:
+        def parse(line: str) -> Optional[int]:
+            if "T" not in line and "t" not in line:
+                return None
+            m = search(line)
+            return int(m.group(m.lastindex)) if m else None
 
-    patterns = [
-        r"\bT\s*[=#]?\s*\"?\s*\d+\b", # T10, T 10, T=10, T#10, T="10"
-        r"\bTOOL\s*(?:NO\.?)?\s*[=:]?\s*\d+\b", # TOOL 10, TOOL NO 10, TOOL NO. 10
-        r"\bTOOL\s*CALL\s*\d+\b", # TOOL CALL 10
-    ]
+    return parse
 
-    for pat in patterns:
-        if re.search(pat, line, flags=re_flags):
-            return True
-    return False
 
+def parse_tool_number(line: str, case_sensitive: bool = False) -> Optional[int]:
+    """One-off convenience wrapper; scans should compile the parser once instead."""
+    return compile_tool_number_parser(case_sensitive)(line) if line else None
 
-def scan_file_for_hits(
-    input_path: str,
-    target_text: str,
+
+def compile_operation_number_parser(
+    op_no_text: str,
+    case_sensitive: bool = False,
+    use_regex: bool = False,
+) -> Callable[[str], Optional[int]]:
+    r"""
+    Returns a function that parses the operation number out of an op-no
+    line: the integer right after the op-no search text, separated from it
+    by nothing but punctuation / whitespace.
+
+    Matches examples (op_no_text "OPERATION NO. ="):
+      - (OPERATION NO. = 12)
+      - N100 (OPERATION NO. =12 )
+
+    With use_regex the pattern may match the number itself (e.g.
+    r"OPERATION NO\.\s*=\s*\d+"), so the first integer from the start of
+    the pattern's match is taken instead.
+    """
+    if not op_no_text:
+        return lambda line: None
+
+    flags = 0 if case_sensitive else re.IGNORECASE
+    if use_regex:
+        find = compile_pattern(op_no_text, flags).search
+
+        def parse_regex(line: str) -> Optional[int]:
+            m = find(line)
+            if m is None:
+                return None
+            number = _DIGITS(line, m.start())
+            return int(number.group()) if number else None
+
+        return parse_regex
+
+    search = compile_pattern(
+        rf"(?:{re.escape(op_no_text)})[^0-9A-Za-z]*(?P<_op_number>\d+)", flags
+    ).search
+
+    def parse(line: str) -> Optional[int]:
+        m = search(line)
+        return int(m.group("_op_number")) if m else None
+
+    return parse
+
+
+_DIGITS = re.compile(r"\d+").search
+
+
+# Sequence number at the start of a block, after an optional block-delete slash
+_N_BLOCK = re.compile(r"/?\s*N(\d+)", re.IGNORECASE).match
+
+
+class _FieldExtractor:
+    """
+    Fills a hit row's typed columns from its raw lines:
+
+      - operation_no: int from operation_no_line (see compile_operation_number_parser())
+      - tool_number:  int from tool_number_line (see compile_tool_number_parser())
+      - n_block:      N sequence number the hit line starts with
+
+    Context lines change only when a tracker fires, so each distinct context
+    line is parsed once and the result reused for every hit under it.
+    """
+
+    def __init__(self, op_no_text: str, case_sensitive: bool = False, use_regex: bool = False):
+        self._parse_op = compile_operation_number_parser(op_no_text, case_sensitive, use_regex)
+        self._parse_tool = compile_tool_number_parser(case_sensitive)
+        self._op_line: Optional[str] = None
+        self._op: Optional[int] = None
+        self._tool_line: Optional[str] = None
+        self._tool: Optional[int] = None
+
+    def __call__(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        line = row["operation_no_line"]
+        if line != self._op_line:
+            self._op_line = line
+            self._op = self._parse_op(line) if line else None
+
+        line = row["tool_number_line"]
+        if line != self._tool_line:
+            self._tool_line = line
+            self._tool = self._parse_tool(line) if line else None
+
+        m = _N_BLOCK(row["target_line"])
+        row["operation_no"] = self._op
+        row["tool_number"] = self._tool
+        row["n_block"] = int(m.group(1)) if m else None
+        return row
+
+
+def _iter_scan(
+    lines: Iterable[str],
+    target_text: Targets,
     parent_text: str,
     use_parent: bool,
     op_no_text: str,
     tool_change_text: str,
-    case_sensitive: bool = False,
-) -> Tuple[List[Dict[str, Any]], int]:
+    case_sensitive: bool,
+    use_regex: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Core scan loop. Consumes lines lazily and yields one dict per target
+    hit, so only the context trackers are held in memory.
 
-    lines = read_text_file_lines(input_path)
+    context_before lines come from a ring buffer of the last lines seen.
+    For context_after, hits wait in a queue until enough lines have
+    followed (or the file ends), so memory is O(before + after).
+    """
+    targets = normalize_targets(target_text)
+    match = build_tracker_matcher(
+        targets, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive, use_regex
+    ).match
+    parse_tool = compile_tool_number_parser(case_sensitive)
 
     last_parent: Optional[str] = None
     last_op_no: Optional[str] = None
     last_tool_change: Optional[str] = None
     last_tool_number: Optional[str] = None
 
-    rows: List[Dict[str, Any]] = []
+    hit_count = 0
+
+    before: Optional[Deque[str]] = deque(maxlen=context_before) if context_before > 0 else None
+    pending: Deque[Tuple[Dict[str, Any], List[str]]] = deque()  # hits still collecting context_after
 
     for idx, line in enumerate(lines):
         stripped = line.strip()
 
+        if pending:
+            for _, after in pending:
+                after.append(stripped)
+            while pending and len(pending[0][1]) >= context_after:
+                yield _with_context_after(*pending.popleft())
+
+        fired = match(stripped)
+
         # Update context trackers (capture FULL line)
-        if use_parent and parent_text and _contains(stripped, parent_text, case_sensitive):
+        if fired & TRACK_PARENT:
             last_parent = stripped
 
-        if op_no_text and _contains(stripped, op_no_text, case_sensitive):
+        if fired & TRACK_OP_NO:
             last_op_no = stripped
 
-        if tool_change_text and _contains(stripped, tool_change_text, case_sensitive):
+        if fired & TRACK_TOOL_CHANGE:
             last_tool_change = stripped
 
         # IMPORTANT: tool-number tracker must run BEFORE target-hit check
-        if _tool_number_match(stripped, case_sensitive):
+        if parse_tool(stripped) is not None:
             last_tool_number = stripped
 
-        # Target hit (one row per hit)
-        if target_text and _contains(stripped, target_text, case_sensitive):
-            rows.append({
-                "hit_index": len(rows) + 1,
-                "line_number": idx + 1,
-                "target_text": target_text,
-                "target_line": stripped,
-                "operation_no_line": last_op_no or "",
-                "tool_number_line": last_tool_number or "",
-                "tool_change_line": last_tool_change or "",
-                "parent_line": last_parent or "",
-            })
+        # Target hit (one row per target on the line)
+        if fired & TRACK_TARGET:
+            for target in _matched_targets(fired, targets):
+                hit_count += 1
+                row = _hit_row(
+                    hit_count, idx + 1, target, stripped,
+                    last_op_no, last_tool_number, last_tool_change, last_parent,
+                )
+                if before is not None:
+                    row["context_before"] = "\n".join(before)
+                if context_after > 0:
+                    pending.append((row, []))
+                else:
+                    yield row
+
+        if before is not None:
+            before.append(stripped)
+
+    # End of file: the remaining hits get whatever lines followed them
+    for row, after in pending:
+        yield _with_context_after(row, after)
+
+
+def _with_context_after(row: Dict[str, Any], after: List[str]) -> Dict[str, Any]:
+    row["context_after"] = "\n".join(after)
+    return row
+
+
+SCAN_BACKENDS = ("auto", "text", "bytes", "mmap")
+SCAN_CHUNK_BYTES = 8 << 20
+
+# Files smaller than this are scanned sequentially even when workers > 1
+PARALLEL_MIN_BYTES = 64 << 20
+
+# Cheap superset of the tool-number styles for screening raw buffers: it starts
+# with a literal (so the regex engine can skip ahead quickly) and whitespace
+# may not cross a newline. Candidate lines are confirmed with the full pattern.
+_TOOL_SCREEN_PATTERN = rb'T(?:[^\S\n]*[=#]?[^\S\n]*"?[^\S\n]*\d|OOL)'
+_TOOL_SCREEN_PATTERN_LOWER = rb't(?:[^\S\n]*[=#]?[^\S\n]*"?[^\S\n]*\d|ool)'
+
+
+def _hit_row(
+    hit_index: int,
+    line_number: int,
+    target_text: str,
+    target_line: str,
+    op_no: Optional[str],
+    tool_number: Optional[str],
+    tool_change: Optional[str],
+    parent: Optional[str],
+) -> Dict[str, Any]:
+    return {
+        "hit_index": hit_index,
+        "line_number": line_number,
+        "target_text": target_text,
+        "target_line": target_line,
+        "operation_no_line": op_no or "",
+        "tool_number_line": tool_number or "",
+        "tool_change_line": tool_change or "",
+        "parent_line": parent or "",
+    }
+
+
+def _is_ascii(*texts: str) -> bool:
+    return all(t.isascii() for t in texts if t)
+
+
+# ASCII bytes str treats differently from bytes: line breaks for
+# str.splitlines() (\v \f \x1c-\x1e) and whitespace for str.strip() / \s (\x1f)
+_STR_SPECIAL_BYTES = (b"\x0b", b"\x0c", b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+
+# CR that is not part of a CRLF
+_BARE_CR = re.compile(rb"\r(?!\n)").search
+
+# Lines of a normalized region that only the str matcher can classify
+_TEXT_ONLY_BYTES = re.compile(rb"[\x1f\x80-\xff]").finditer
+
+
+def _is_plain_region(region: bytes) -> bool:
+    """True if bytes-level splitting, stripping and matching of region agree with str's."""
+    return (
+        region.isascii()
+        and not any(b in region for b in _STR_SPECIAL_BYTES)
+        and (b"\r" not in region or _BARE_CR(region) is None)
+    )
+
+
+class _BytesScanner:
+    """
+    Bytes-level scan engine.
+
+    Works on raw file bytes. Each needle (and a screen for the tool-number
+    styles) is located with a literal-prefixed bytes regex over the whole
+    buffer, which runs at memchr speed; in case-insensitive mode the buffer
+    is ASCII-lowercased once first. Lines no needle lands on (plain motion
+    blocks) are never sliced, decoded, stripped or lowercased individually.
+    Only lines a needle lands on are classified, and only lines that fire a
+    tracker or the target are decoded to str.
+
+    That shortcut only gives the text engine's results for plain ASCII with
+    LF/CRLF line endings. A region with anything else (non-ASCII bytes, a
+    bare CR, the other str.splitlines() breaks, \x1f) is first rewritten as
+    UTF-8 with one LF per str line (each raw line decoded as UTF-8, or
+    cp1252 if that fails), and its candidate lines - including every line
+    with such a byte - are classified with the text engine's str matcher
+    and tool-number parser.
+
+    Requires ASCII needles. Tracker state and the running line count live on
+    the instance, so consecutive scan() calls continue where the last left off.
+
+    on_context, if given, is called as on_context(line_number, bits, line)
+    for every line that updates a context tracker (TRACK_* bits, with
+    TRACK_TOOL_NUMBER for the tool-number tracker). track_tool_number=False
+    drops the tool-number tracker, for target-only scans.
+
+    context_before / context_after capture the lines around each hit. Lines
+    before a hit are sliced from the buffer, falling back to the last lines
+    of the previous scan() call; a hit whose following lines run past the
+    buffer waits in a queue until the next scan() call (or finish()) so
+    rows still come out in file order.
+    """
+
+    def __init__(
+        self,
+        target_text: Targets,
+        parent_text: str,
+        use_parent: bool,
+        op_no_text: str,
+        tool_change_text: str,
+        case_sensitive: bool = False,
+        track_tool_number: bool = True,
+        on_context: Optional[Callable[[int, int, str], None]] = None,
+        context_before: int = 0,
+        context_after: int = 0,
+    ):
+        self.targets = normalize_targets(target_text)
+        self.case_sensitive = case_sensitive
+        self.on_context = on_context
+        self.context_before = max(0, context_before)
+        self.context_after = max(0, context_after)
+        self._tail: Deque[bytes] = deque(maxlen=self.context_before or None)  # lines before the next region
+        self._pending: Deque[Tuple[Dict[str, Any], List[str]]] = deque()  # hits still collecting context_after
+
+        tracked = [
+            (TRACK_PARENT, parent_text if use_parent else ""),
+            (TRACK_OP_NO, op_no_text),
+            (TRACK_TOOL_CHANGE, tool_change_text),
+            *_target_needles(self.targets),
+        ]
+        self._needles: List[Tuple[int, bytes]] = [
+            (bit, (text if case_sensitive else text.lower()).encode("ascii"))
+            for bit, text in tracked
+            if text
+        ]
+
+        screens = [re.escape(n) for n in {n for _, n in self._needles}]
+        self._tool = None
+        if track_tool_number:
+            screens.append(_TOOL_SCREEN_PATTERN if case_sensitive else _TOOL_SCREEN_PATTERN_LOWER)
+            self._tool = re.compile(
+                _TOOL_NUMBER_PATTERN.encode("ascii"), 0 if case_sensitive else re.IGNORECASE
+            ).search
+        self._finders = [re.compile(p).finditer for p in screens]
+
+        # str counterparts for lines that need the text engine's semantics
+        self._match = build_tracker_matcher(
+            self.targets, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive
+        ).match
+        self._parse_tool = compile_tool_number_parser(case_sensitive) if track_tool_number else None
+
+        self.line_count = 0
+        self.hit_count = 0
+        self.cp1252_lines = 0  # raw lines that were not valid UTF-8
+        self.last_parent: Optional[str] = None
+        self.last_op_no: Optional[str] = None
+        self.last_tool_change: Optional[str] = None
+        self.last_tool_number: Optional[str] = None
+
+    def scan(self, buf, start: int, end: int) -> Iterator[Dict[str, Any]]:
+        """
+        Scans the lines in buf[start:end] and yields a row per target hit.
+
+        start must be the start of a line; end must be just past a newline
+        or the end of the data.
+        """
+        region = buf[start:end]
+        as_text = not _is_plain_region(region)
+        if as_text:
+            region = self._normalize(region)
+        hay = region if self.case_sensitive else region.lower()
+        with_context = self.context_before or self.context_after
+
+        if self._pending:
+            yield from self._feed_pending(region)
+
+        candidates: List[int] = []
+        finders = self._finders + [_TEXT_ONLY_BYTES] if as_text else self._finders
+        for finditer in finders:
+            candidates.extend(m.start() for m in finditer(hay))
+        candidates.sort()
+
+        line_no = self.line_count
+        counted = 0
+        next_line = 0
+
+        for pos in candidates:
+            if pos < next_line:
+                continue  # another needle already landed on this line
+
+            line_start = hay.rfind(b"\n", 0, pos) + 1
+            line_end = hay.find(b"\n", pos)
+            if line_end < 0:
+                line_end = len(hay)
+
+            line_no += hay.count(b"\n", counted, line_start)
+            counted = line_start
+
+            for hit in self._classify(region[line_start:line_end], line_no + 1, as_text):
+                if with_context:
+                    yield from self._add_context(hit, region, line_start, line_end)
+                else:
+                    yield hit
+
+            next_line = line_end + 1
+
+        self.line_count = line_no + hay.count(b"\n", counted)
+        if self.context_before and region.endswith(b"\n"):
+            lines, reached_start = _lines_before(region, len(region), self.context_before)
+            if not reached_start:
+                self._tail.clear()
+            self._tail.extend(lines)
+
+    def _normalize(self, region: bytes) -> bytes:
+        """region as UTF-8 with one LF-terminated line per str.splitlines() line."""
+        try:
+            text = region.decode("utf-8")
+        except UnicodeDecodeError:
+            pieces = []
+            for raw in region.split(b"\n"):
+                try:
+                    pieces.append(raw.decode("utf-8"))
+                except UnicodeDecodeError:
+                    self.cp1252_lines += 1
+                    pieces.append(raw.decode("cp1252", errors="replace"))
+            text = "\n".join(pieces)
+
+        lines = text.splitlines()
+        normalized = "\n".join(lines)
+        if lines and text[-1] in _LINE_BREAK_CHARS:
+            normalized += "\n"
+        return normalized.encode("utf-8")
+
+    @staticmethod
+    def _decode(raw: bytes) -> str:
+        # Regions are plain ASCII or normalized to UTF-8
+        return raw.decode("utf-8").strip()
+
+    def finish(self) -> Iterator[Dict[str, Any]]:
+        """Yields the hits still waiting for context_after lines once the data has ended."""
+        while self._pending:
+            yield _with_context_after(*self._pending.popleft())
+
+    def _add_context(self, row: Dict[str, Any], region: bytes, line_start: int, line_end: int):
+        if self.context_before:
+            lines, reached_start = _lines_before(region, line_start, self.context_before)
+            missing = self.context_before - len(lines)
+            if reached_start and missing > 0 and self._tail:
+                lines = list(self._tail)[-missing:] + lines
+            row["context_before"] = "\n".join(self._decode(raw) for raw in lines)
+
+        if self.context_after:
+            after = [self._decode(raw) for raw in _lines_after(region, line_end + 1, self.context_after)]
+            if self._pending or len(after) < self.context_after:
+                self._pending.append((row, after))
+                return
+            _with_context_after(row, after)
+
+        yield row
+
+    def _feed_pending(self, region: bytes) -> Iterator[Dict[str, Any]]:
+        need = self.context_after - len(self._pending[-1][1])
+        first = [self._decode(raw) for raw in _lines_after(region, 0, need)]
+        for _, after in self._pending:
+            missing = self.context_after - len(after)
+            if missing > 0:
+                after.extend(first[:missing])
+        while self._pending and len(self._pending[0][1]) >= self.context_after:
+            yield _with_context_after(*self._pending.popleft())
+
+    def _classify(self, raw: bytes, line_number: int, as_text: bool = False) -> List[Dict[str, Any]]:
+        line: Optional[str] = None
+        if as_text:
+            # Unicode strip / lowercase and str \b \s \d, as in the text engine
+            line = self._decode(raw)
+            fired = self._match(line)
+            if self._parse_tool is not None and self._parse_tool(line) is not None:
+                fired |= TRACK_TOOL_NUMBER
+        else:
+            raw = raw.strip()
+            haystack = raw if self.case_sensitive else raw.lower()
+
+            fired = 0
+            for bit, needle in self._needles:
+                if needle in haystack:
+                    fired |= bit
+            if self._tool is not None and self._tool(raw) is not None:
+                fired |= TRACK_TOOL_NUMBER
+            if fired:
+                line = self._decode(raw)
+
+        # Update context trackers (capture FULL line)
+        if fired & TRACK_PARENT:
+            self.last_parent = line
+        if fired & TRACK_OP_NO:
+            self.last_op_no = line
+        if fired & TRACK_TOOL_CHANGE:
+            self.last_tool_change = line
+
+        # IMPORTANT: tool-number tracker must run BEFORE target-hit check
+        if fired & TRACK_TOOL_NUMBER:
+            self.last_tool_number = line
+
+        if self.on_context is not None and fired & _CONTEXT_BITS:
+            self.on_context(line_number, fired & _CONTEXT_BITS, line)
+
+        if not fired & TRACK_TARGET:
+            return []
+
+        rows = []
+        for target in _matched_targets(fired, self.targets):
+            self.hit_count += 1
+            rows.append(_hit_row(
+                self.hit_count, line_number, target, line,
+                self.last_op_no, self.last_tool_number, self.last_tool_change, self.last_parent,
+            ))
+        return rows
+
+
+def _lines_before(region: bytes, line_start: int, count: int) -> Tuple[List[bytes], bool]:
+    """
+    Up to count raw lines ending just before line_start, in file order, and
+    whether the start of region was reached.
+    """
+    lines: List[bytes] = []
+    pos = line_start
+    while len(lines) < count and pos > 0:
+        prev = region.rfind(b"\n", 0, pos - 1) + 1
+        lines.append(region[prev:pos - 1])
+        pos = prev
+    lines.reverse()
+    return lines, pos == 0
+
+
+def _lines_after(region: bytes, pos: int, count: int) -> List[bytes]:
+    """Up to count raw lines starting at pos."""
+    lines: List[bytes] = []
+    size = len(region)
+    while len(lines) < count and pos < size:
+        nl = region.find(b"\n", pos)
+        end = size if nl < 0 else nl
+        lines.append(region[pos:end])
+        pos = end + 1
+    return lines
+
+
+def _iter_bytes_scan(
+    path: str,
+    scanner: _BytesScanner,
+    advance: Optional[Callable[[int], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    carry = b""
+    done = 0
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(SCAN_CHUNK_BYTES)
+            if not chunk:
+                break
+            buf = carry + chunk
+            cut = buf.rfind(b"\n") + 1
+            if cut:
+                yield from scanner.scan(buf, 0, cut)
+            carry = buf[cut:]
+            done += len(chunk)
+            if advance is not None:
+                advance(done - len(carry))
+
+    if carry:
+        yield from scanner.scan(carry, 0, len(carry))
+        if advance is not None:
+            advance(done)
+    yield from scanner.finish()
+
+
+def _iter_mmap_scan(
+    path: str,
+    scanner: _BytesScanner,
+    start: int = 0,
+    end: Optional[int] = None,
+    advance: Optional[Callable[[int], None]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Runs the bytes engine over a read-only memory map of the file.
+
+    Line boundaries are found in the mapped region itself and only one
+    SCAN_CHUNK_BYTES window is copied out at a time, so repeated scans of the
+    same file (e.g. several targets in a row) are served from the OS page
+    cache without reading the file into a Python buffer.
+
+    start/end restrict the scan to a byte range (start at a line start, end
+    just past a newline or at EOF), as used by the parallel scan.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            stop = size if end is None else min(end, size)
+            while start < stop:
+                window_end = min(start + SCAN_CHUNK_BYTES, stop)
+                if window_end < stop:
+                    cut = mm.rfind(b"\n", start, window_end)
+                    if cut < 0:
+                        # Line longer than a window: extend to its end
+                        cut = mm.find(b"\n", window_end, stop)
+                        window_end = stop if cut < 0 else cut + 1
+                    else:
+                        window_end = cut + 1
+                yield from scanner.scan(mm, start, window_end)
+                start = window_end
+                if advance is not None:
+                    advance(start)
+    yield from scanner.finish()
+
+
+_CONTEXT_KEYS = ("operation_no_line", "tool_number_line", "tool_change_line", "parent_line")
+
+
+def _split_line_ranges(path: str, parts: int) -> List[Tuple[int, int]]:
+    """Splits the file into up to `parts` byte ranges that start and end on line boundaries."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            bounds = [0]
+            for i in range(1, parts):
+                nl = mm.find(b"\n", max(size * i // parts - 1, bounds[-1]))
+                if nl < 0 or nl + 1 >= size:
+                    break
+                if nl + 1 > bounds[-1]:
+                    bounds.append(nl + 1)
+            bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _scan_line_range(
+    path: str,
+    start: int,
+    end: int,
+    args: Tuple[Any, ...],
+) -> Tuple[List[Dict[str, Any]], int, Dict[str, str], int]:
+    """
+    Process-pool worker for the parallel scan.
+
+    Scans one byte range with fresh trackers. Context that was not seen yet
+    inside the range is left blank for the stitching step to fill in, and
+    the range's last context values are returned alongside its line count
+    and the number of lines it had to decode as cp1252.
+    """
+    scanner = _BytesScanner(*args)
+    rows = list(_iter_mmap_scan(path, scanner, start, end))
+    tail = {
+        "operation_no_line": scanner.last_op_no or "",
+        "tool_number_line": scanner.last_tool_number or "",
+        "tool_change_line": scanner.last_tool_change or "",
+        "parent_line": scanner.last_parent or "",
+    }
+    return rows, scanner.line_count, tail, scanner.cp1252_lines
+
+
+def _iter_parallel_scan(
+    path: str,
+    args: Tuple[Any, ...],
+    workers: int,
+    advance: Optional[Callable[[int], None]] = None,
+    decode_stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Splits the file into line-aligned byte ranges, scans them in a process
+    pool and stitches the results back together in file order.
+
+    A tracker line can never be blank, so a blank context field in a range's
+    hit means "not seen yet in this range" and is filled from the closest
+    preceding range that saw one. Line numbers are offset by the line counts
+    of the preceding ranges and hit indexes are renumbered, which makes the
+    output identical to the sequential bytes scan.
+
+    decode_stats, if given, gets "cp1252_lines" summed over the ranges.
+    """
+    ranges = _split_line_ranges(path, workers * 4)
+    if not ranges:
+        return
+
+    carried = dict.fromkeys(_CONTEXT_KEYS, "")
+    line_offset = 0
+    hit_count = 0
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        results = pool.map(
+            _scan_line_range,
+            repeat(path),
+            [r[0] for r in ranges],
+            [r[1] for r in ranges],
+            repeat(args),
+        )
+        for (_, range_end), (rows, line_count, tail, cp1252_lines) in zip(ranges, results):
+            if decode_stats is not None:
+                decode_stats["cp1252_lines"] = decode_stats.get("cp1252_lines", 0) + cp1252_lines
+            for row in rows:
+                hit_count += 1
+                row["hit_index"] = hit_count
+                row["line_number"] += line_offset
+                for key in _CONTEXT_KEYS:
+                    if not row[key]:
+                        row[key] = carried[key]
+                yield row
+
+            line_offset += line_count
+            for key in _CONTEXT_KEYS:
+                if tail[key]:
+                    carried[key] = tail[key]
+
+            if advance is not None:
+                advance(range_end)
+    finally:
+        # Don't start queued ranges if the caller stopped early (e.g. cancel)
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class ScanCancelled(Exception):
+    """Raised by scan_file_for_hits() when its cancel callback asks it to stop."""
+
+
+class _ScanProgress:
+    """
+    Glue between the engines and the caller's progress/cancel callbacks.
+
+    Engines call advance(bytes_done) once per chunk; the cancel check runs
+    there too, so a scan stops within one chunk of being cancelled.
+    """
+
+    def __init__(
+        self,
+        total_bytes: int,
+        progress: Optional[Callable[[int, int, int], None]],
+        cancel: Optional[Callable[[], bool]],
+    ):
+        self.total_bytes = total_bytes
+        self.hits = 0
+        self._progress = progress
+        self._cancel = cancel
+
+    def advance(self, bytes_done: int) -> None:
+        if self._cancel is not None and self._cancel():
+            raise ScanCancelled()
+        if self._progress is not None:
+            self._progress(bytes_done, self.total_bytes, self.hits)
+
+
+def _has_lf_line_endings(path: str) -> bool:
+    """
+    Sniffs the head of the file for LF/CRLF line endings (vs. bare CR).
+
+    Only a speed hint for the bytes engine, which splits buffers at LFs: it
+    still gives the right lines for bare CRs later in the file.
+    """
+    with open(path, "rb") as f:
+        head = f.read(64 * 1024)
+    return b"\n" in head or b"\r" not in head
+
+
+def _resolve_backend(path: str, backend: str, *needles: str, use_regex: bool = False) -> str:
+    if backend not in SCAN_BACKENDS:
+        raise ValueError(f"Unknown scan backend: {backend!r} (expected one of {', '.join(SCAN_BACKENDS)})")
+    if use_regex:
+        # Buffer-wide regex search could match across line breaks; patterns run per line
+        if backend in ("bytes", "mmap"):
+            raise ValueError(f"The {backend} backend does not support regex search.")
+        return "text"
+    if backend == "auto":
+        return "bytes" if _is_ascii(*needles) and _has_lf_line_endings(path) else "text"
+    if backend in ("bytes", "mmap") and not _is_ascii(*needles):
+        raise ValueError(f"The {backend} backend requires ASCII search text.")
+    return backend
+
+
+def iter_hits(
+    input_path: str,
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    use_regex: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+    backend: str = "auto",
+    workers: int = 1,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Scans input_path and yields one row dict per target hit, in file order,
+    as the scan reaches it. Nothing but the context trackers is held in
+    memory, so callers can stop early (closing the generator stops the
+    scan), paginate, filter or pipe rows into other sinks.
+
+    target_text may be a single string or a sequence of targets, all
+    matched in the same pass. Each row's target_text names the target that
+    matched; a line with several targets gives one row per target, in the
+    order given.
+
+    backend selects the scan engine:
+      - "text":  decodes and checks every line (any encoding, any needles)
+      - "bytes": works on raw bytes and only decodes lines that match;
+                 needs ASCII needles, fastest on LF/CRLF line endings
+      - "mmap":  the bytes engine over a memory-mapped file
+      - "auto":  "bytes" for ASCII needles and LF/CRLF line endings,
+                 otherwise "text" (default)
+
+    use_regex=True treats the target(s) and every tracker text as regular
+    expressions searched within each line (see TrackerMatcher); it always
+    runs on the text engine.
+
+    context_before / context_after > 0 add the given number of lines before
+    and after each hit to its row ("context_before" / "context_after",
+    newline-joined; fewer at the start and end of the file). The file is
+    still read once: earlier lines come from a ring buffer and a hit waits
+    in a queue until its following lines have been read.
+
+    workers > 1 splits files of at least PARALLEL_MIN_BYTES into line-aligned
+    byte ranges scanned in a process pool (bytes/mmap engines only, and not
+    with context lines; the text engine always runs sequentially). The rows
+    are identical to a sequential scan.
+
+    progress, if given, is called as progress(bytes_done, total_bytes,
+    hits_so_far) roughly once per chunk read. cancel, if given, is polled at
+    the same points; when it returns True the scan stops and ScanCancelled
+    is raised from the generator.
+    """
+    args = (target_text, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive)
+    resolved = _resolve_backend(
+        input_path, backend, *normalize_targets(target_text),
+        parent_text if use_parent else "", op_no_text, tool_change_text,
+        use_regex=use_regex,
+    )
+    size = os.path.getsize(input_path)
+    tracker = _ScanProgress(size, progress, cancel)
+    advance = tracker.advance if (progress is not None or cancel is not None) else None
+    context = {"context_before": max(0, context_before), "context_after": max(0, context_after)}
+    with_context = context["context_before"] or context["context_after"]
+
+    scanner: Optional[_BytesScanner] = None
+    decode_stats: Dict[str, int] = {}
+    key = _file_cache_key(input_path)
+
+    if resolved != "text" and workers > 1 and size >= PARALLEL_MIN_BYTES and not with_context:
+        hits = _iter_parallel_scan(input_path, args, workers, advance, decode_stats)
+    elif resolved == "bytes":
+        scanner = _BytesScanner(*args, **context)
+        hits = _iter_bytes_scan(input_path, scanner, advance)
+    elif resolved == "mmap":
+        scanner = _BytesScanner(*args, **context)
+        hits = _iter_mmap_scan(input_path, scanner, advance=advance)
+    else:
+        # Records its whole-file detection itself
+        hits = _iter_scan(iter_text_file_lines(input_path, advance), *args, use_regex, **context)
+
+    extract = _FieldExtractor(op_no_text, case_sensitive, use_regex)
+    for row in hits:
+        tracker.hits += 1
+        yield extract(row)
+
+    if resolved != "text":
+        cp1252_lines = scanner.cp1252_lines if scanner is not None else decode_stats.get("cp1252_lines", 0)
+        _store_encoding(key, DetectedEncoding("cp1252" if cp1252_lines else "utf-8", whole_file=False))
+
+
+def scan_file_for_hits(
+    input_path: str,
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    use_regex: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+    backend: str = "auto",
+    workers: int = 1,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Scans input_path and returns (rows, total_hits), one row per target hit.
+
+    List-returning wrapper around iter_hits(); see there for the options.
+    """
+    rows = list(iter_hits(
+        input_path,
+        target_text,
+        parent_text,
+        use_parent,
+        op_no_text,
+        tool_change_text,
+        case_sensitive,
+        use_regex,
+        context_before,
+        context_after,
+        backend=backend,
+        workers=workers,
+        progress=progress,
+        cancel=cancel,
+    ))
 
     return rows, len(rows)
 
 
+class ContextTable:
+    """
+    Interns context lines for compact hit records. Each distinct line is
+    stored once and referred to by a small integer id; id 0 is "" (no
+    context seen yet).
+    """
+
+    def __init__(self):
+        self.lines: List[str] = [""]
+        self._ids: Dict[str, int] = {"": 0}
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, context_id: int) -> str:
+        return self.lines[context_id]
+
+    def intern(self, line: str) -> int:
+        context_id = self._ids.get(line)
+        if context_id is None:
+            context_id = self._ids[line] = len(self.lines)
+            self.lines.append(line)
+        return context_id
+
+
+class HitRecord(NamedTuple):
+    """
+    Compact hit: context lines are ids into a ContextTable, so a hit costs a
+    tuple of small ints plus its own target line. Grouping by operation or
+    tool is grouping by int.
+    """
+    hit_index: int
+    line_number: int
+    target_text: str
+    target_line: str
+    operation_no_id: int
+    tool_number_id: int
+    tool_change_id: int
+    parent_id: int
+    operation_no: Optional[int] = None
+    tool_number: Optional[int] = None
+    n_block: Optional[int] = None
+    context_before: Optional[str] = None
+    context_after: Optional[str] = None
+
+    def to_row(self, table: ContextTable) -> Dict[str, Any]:
+        """Expands the record back into the row dict used by the reports."""
+        return {
+            "hit_index": self.hit_index,
+            "line_number": self.line_number,
+            "target_text": self.target_text,
+            "target_line": self.target_line,
+            "operation_no_line": table[self.operation_no_id],
+            "tool_number_line": table[self.tool_number_id],
+            "tool_change_line": table[self.tool_change_id],
+            "parent_line": table[self.parent_id],
+            "operation_no": self.operation_no,
+            "tool_number": self.tool_number,
+            "n_block": self.n_block,
+            "context_before": self.context_before,
+            "context_after": self.context_after,
+        }
+
+
+def iter_hit_records(rows: Iterable[Dict[str, Any]], table: ContextTable) -> Iterator[HitRecord]:
+    """Converts row dicts (e.g. from iter_hits()) into HitRecords, interning context into table."""
+    intern = table.intern
+    for r in rows:
+        yield HitRecord(
+            r["hit_index"],
+            r["line_number"],
+            r["target_text"],
+            r["target_line"],
+            intern(r["operation_no_line"]),
+            intern(r["tool_number_line"]),
+            intern(r["tool_change_line"]),
+            intern(r["parent_line"]),
+            r.get("operation_no"),
+            r.get("tool_number"),
+            r.get("n_block"),
+            r.get("context_before"),
+            r.get("context_after"),
+        )
+
+
+def scan_file_for_hit_records(
+    input_path: str,
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    **kwargs: Any,
+) -> Tuple[List[HitRecord], ContextTable]:
+    """
+    Like scan_file_for_hits(), but returns compact HitRecords plus the
+    ContextTable they point into. Each row dict is converted as soon as the
+    scan yields it, so only the compact records are kept. Extra keyword
+    arguments are passed to iter_hits().
+    """
+    table = ContextTable()
+    rows = iter_hits(
+        input_path, target_text, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive, **kwargs
+    )
+    return list(iter_hit_records(rows, table)), table
+
+
+OPERATION_SUMMARY_FIELDNAMES = [
+    "parent_line",
+    "operation_no_line",
+    "tool_number_line",
+    "operation_no",
+    "tool_number",
+    "hit_count",
+    "first_line",
+    "last_line",
+    "line_span",
+]
+
+
+class OperationSummary:
+    """
+    Running per-operation aggregates over hit rows, keyed by (parent line,
+    op-no line, tool number line): hit count, first and last hit line and
+    the span between them.
+
+    Meant to ride along with a scan via observe(), so the summary is built
+    in the same pass and the per-hit rows never have to be kept.
+    """
+
+    def __init__(self):
+        # key -> [hit_count, first_line, last_line, operation_no, tool_number], in first-seen order
+        self.groups: Dict[Tuple[str, str, str], List[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        key = (row["parent_line"], row["operation_no_line"], row["tool_number_line"])
+        line_number = row["line_number"]
+        agg = self.groups.get(key)
+        if agg is None:
+            self.groups[key] = [1, line_number, line_number, row.get("operation_no"), row.get("tool_number")]
+        else:
+            agg[0] += 1
+            agg[2] = line_number
+
+    def observe(self, rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Passes rows through unchanged while adding each one to the summary."""
+        for row in rows:
+            self.add(row)
+            yield row
+
+    def rows(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "parent_line": parent,
+                "operation_no_line": op_no,
+                "tool_number_line": tool,
+                "operation_no": op_number,
+                "tool_number": tool_number,
+                "hit_count": count,
+                "first_line": first,
+                "last_line": last,
+                "line_span": last - first,
+            }
+            for (parent, op_no, tool), (count, first, last, op_number, tool_number) in self.groups.items()
+        ]
+
+
+def operation_summary_path_for_report(report_path: str) -> str:
+    return os.path.splitext(report_path)[0] + "_operations.csv"
+
+
+def write_operation_summary_csv(summary_path: str, summary: OperationSummary) -> None:
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=OPERATION_SUMMARY_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(summary.rows())
+
+
 def default_csv_report_path_in_dir(input_path: str, output_dir: str) -> str:
     base = os.path.splitext(os.path.basename(input_path))[0]
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     return os.path.join(output_dir, f"{base}_MCDTargetHunter_{ts}.csv")
 
 
-def write_csv_report(report_path: str, rows: List[Dict[str, Any]], total_hits: int) -> None:
-    fieldnames = [
-        "total_hits",
-        "hit_index",
-        "line_number",
-        "target_text",
-        "target_line",
-        "operation_no_line",
-        "tool_number_line",
-        "tool_change_line",
-        "parent_line",
-    ]
+CSV_FIELDNAMES = [
+    "total_hits",
+    "hit_index",
+    "line_number",
+    "target_text",
+    "target_line",
+    "operation_no_line",
+    "tool_number_line",
+    "tool_change_line",
+    "parent_line",
+    "operation_no",
+    "tool_number",
+    "n_block",
+    "context_before",
+    "context_after",
+]
+
 
+def write_csv_report(report_path: str, rows: Iterable[Dict[str, Any]], total_hits: int) -> None:
     with open(report_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
         writer.writeheader()
         for r in rows:
-            writer.writerow({"total_hits": total_hits, **r})
\ No newline at end of file
+            writer.writerow({"total_hits": total_hits, **r})
+
+
+# Streamed reports are flushed at least this often so they can be tailed
+STREAM_FLUSH_SECONDS = 0.5
+
+
+def summary_path_for_report(report_path: str) -> str:
+    return os.path.splitext(report_path)[0] + "_summary.json"
+
+
+def write_csv_report_streaming(
+    report_path: str,
+    rows: Iterable[Dict[str, Any]],
+    summary: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Writes rows to the CSV as they are produced (e.g. straight from a scan
+    generator), so no hit is held in memory after it has been written.
+
+    The columns match write_csv_report(), but total_hits is only known at
+    the end: it is left blank in the rows and recorded in a sidecar JSON
+    summary (see summary_path_for_report()) written once the last row is
+    out, together with any extra `summary` fields. A report without its
+    summary file is incomplete (scan cancelled or failed).
+
+    Returns the number of rows written.
+    """
+    total_hits = 0
+    with open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+        writer.writeheader()
+        f.flush()
+        last_flush = time.monotonic()
+
+        for r in rows:
+            writer.writerow({"total_hits": "", **r})
+            total_hits += 1
+
+            now = time.monotonic()
+            if now - last_flush >= STREAM_FLUSH_SECONDS:
+                f.flush()
+                last_flush = now
+
+    with open(summary_path_for_report(report_path), "w", encoding="utf-8") as f:
+        json.dump({
+            "report_path": report_path,
+            "total_hits": total_hits,
+            "completed_at": datetime.now().isoformat(timespec="seconds"),
+            **(summary or {}),
+        }, f, indent=2)
+
+    return total_hits
@@ -0,0 +1,296 @@
+"""
+MCD Target Hunter - SQLite Report Sink
+
+Purpose:
+    Append scan results to one local SQLite database instead of writing a
+    new timestamped CSV per run, so hits from thousands of scans can be
+    queried together.
+
+Schema:
+    - files: one row per scanned path
+    - scans: one row per run (settings, file size/mtime/hash, totals, times)
+    - hits:  one row per target hit, with indexes on target text, operation
+             (parent / op-no line, operation number) and tool (line, number)
+    - v_hits: view joining the three, e.g.
+
+        SELECT * FROM v_hits
+        WHERE target_text = 'POST-GENERATED'
+          AND tool_number = 12
+          AND started_at >= date('now', '-1 month');
+
+Notes:
+    - Default location is reports.sqlite in the per-user config dir
+"""
+
+import json
+import os
+import sqlite3
+from array import array
+from datetime import datetime
+from itertools import islice
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Sequence, Tuple
+
+from .mcd_hunter_core import get_config_dir
+from .mcd_hunter_index import fast_content_hash
+
+REPORT_DB_FILE_NAME = "reports.sqlite"
+
+_INSERT_BATCH_ROWS = 10_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    file_id INTEGER NOT NULL REFERENCES files(id),
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    settings TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    total_hits INTEGER
+);
+CREATE TABLE IF NOT EXISTS hits (
+    id INTEGER PRIMARY KEY,
+    scan_id INTEGER NOT NULL REFERENCES scans(id) ON DELETE CASCADE,
+    hit_index INTEGER NOT NULL,
+    line_number INTEGER NOT NULL,
+    target_text TEXT NOT NULL,
+    target_line TEXT NOT NULL,
+    operation_no_line TEXT NOT NULL,
+    tool_number_line TEXT NOT NULL,
+    tool_change_line TEXT NOT NULL,
+    parent_line TEXT NOT NULL,
+    operation_no INTEGER,
+    tool_number INTEGER,
+    n_block INTEGER,
+    context_before TEXT,
+    context_after TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_scans_file ON scans (file_id, started_at);
+CREATE INDEX IF NOT EXISTS ix_scans_started ON scans (started_at);
+CREATE INDEX IF NOT EXISTS ix_hits_scan ON hits (scan_id, hit_index);
+CREATE INDEX IF NOT EXISTS ix_hits_target ON hits (target_text);
+CREATE INDEX IF NOT EXISTS ix_hits_parent ON hits (parent_line);
+CREATE INDEX IF NOT EXISTS ix_hits_op_no ON hits (operation_no_line);
+CREATE INDEX IF NOT EXISTS ix_hits_tool ON hits (tool_number_line);
+CREATE VIEW IF NOT EXISTS v_hits AS
+    SELECT f.path AS input_path, s.id AS scan_id, s.started_at, h.*
+    FROM hits h
+    JOIN scans s ON s.id = h.scan_id
+    JOIN files f ON f.id = s.file_id;
+"""
+
+# Columns added after the first release of the schema; created on open for
+# databases that predate them
+_ADDED_COLUMNS = (
+    ("operation_no", "INTEGER"),
+    ("tool_number", "INTEGER"),
+    ("n_block", "INTEGER"),
+    ("context_before", "TEXT"),
+    ("context_after", "TEXT"),
+)
+_TYPED_INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_hits_op_number ON hits (operation_no);
+CREATE INDEX IF NOT EXISTS ix_hits_tool_number ON hits (tool_number);
+"""
+
+
+def get_report_db_path() -> str:
+    return os.path.join(get_config_dir(), REPORT_DB_FILE_NAME)
+
+
+def open_report_db(db_path: Optional[str] = None) -> sqlite3.Connection:
+    """Opens (creating if needed) the report database."""
+    db_path = db_path or get_report_db_path()
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.executescript(_SCHEMA)
+
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(hits)")}
+    for column, sql_type in _ADDED_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE hits ADD COLUMN {column} {sql_type}")
+    conn.executescript(_TYPED_INDEXES)
+    return conn
+
+
+def _now() -> str:
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def append_scan_to_db(
+    conn: sqlite3.Connection,
+    input_path: str,
+    rows: Iterable[Dict[str, Any]],
+    settings: Dict[str, Any],
+) -> Tuple[int, int]:
+    """
+    Records one scan of input_path and inserts its rows (e.g. straight from
+    iter_hits()) in batches, all in a single transaction.
+
+    Returns (scan_id, total_hits).
+    """
+    input_path = os.path.abspath(input_path)
+    st = os.stat(input_path)
+    content_hash = fast_content_hash(input_path)
+
+    with conn:
+        conn.execute("INSERT OR IGNORE INTO files (path) VALUES (?)", (input_path,))
+        file_id = conn.execute("SELECT id FROM files WHERE path = ?", (input_path,)).fetchone()[0]
+        scan_id = conn.execute(
+            "INSERT INTO scans (file_id, started_at, settings, size, mtime_ns, content_hash) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (file_id, _now(), json.dumps(settings, sort_keys=True), st.st_size, st.st_mtime_ns, content_hash),
+        ).lastrowid
+
+        total_hits = 0
+        it = iter(rows)
+        while True:
+            batch = [
+                (
+                    scan_id,
+                    r["hit_index"],
+                    r["line_number"],
+                    r["target_text"],
+                    r["target_line"],
+                    r["operation_no_line"],
+                    r["tool_number_line"],
+                    r["tool_change_line"],
+                    r["parent_line"],
+                    r.get("operation_no"),
+                    r.get("tool_number"),
+                    r.get("n_block"),
+                    r.get("context_before"),
+                    r.get("context_after"),
+                )
+                for r in islice(it, _INSERT_BATCH_ROWS)
+            ]
+            if not batch:
+                break
+            conn.executemany(
+                "INSERT INTO hits (scan_id, hit_index, line_number, target_text, target_line, "
+                "operation_no_line, tool_number_line, tool_change_line, parent_line, "
+                "operation_no, tool_number, n_block, context_before, context_after) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                batch,
+            )
+            total_hits += len(batch)
+
+        conn.execute(
+            "UPDATE scans SET finished_at = ?, total_hits = ? WHERE id = ?",
+            (_now(), total_hits, scan_id),
+        )
+
+    return scan_id, total_hits
+
+
+# hits columns shown by result views, in display order
+HIT_VIEW_COLUMNS = (
+    "hit_index",
+    "line_number",
+    "target_text",
+    "target_line",
+    "operation_no",
+    "tool_number",
+    "n_block",
+    "operation_no_line",
+    "tool_number_line",
+    "tool_change_line",
+    "parent_line",
+    "context_before",
+    "context_after",
+)
+
+# Keeps IN (...) lists under SQLite's default host-parameter limit
+_FETCH_BATCH_IDS = 900
+
+
+def _check_column(column: str) -> str:
+    if column not in HIT_VIEW_COLUMNS:
+        raise ValueError(f"Unknown hits column: {column!r}")
+    return column
+
+
+def query_hit_ids(
+    conn: sqlite3.Connection,
+    scan_id: int,
+    order_by: str = "hit_index",
+    descending: bool = False,
+    filters: Optional[Dict[str, Any]] = None,
+) -> "array[int]":
+    """
+    Ids of one scan's hits, sorted by order_by and restricted to rows whose
+    filter columns equal the given values (None matches NULL).
+
+    Only the ids are materialized (8 bytes per hit); callers fetch the rows
+    they actually show with fetch_hits().
+    """
+    where = ["scan_id = ?"]
+    params: List[Any] = [scan_id]
+    for column, value in (filters or {}).items():
+        if value is None:
+            where.append(f"{_check_column(column)} IS NULL")
+        else:
+            where.append(f"{_check_column(column)} = ?")
+            params.append(value)
+
+    direction = "DESC" if descending else "ASC"
+    cur = conn.execute(
+        f"SELECT id FROM hits WHERE {' AND '.join(where)} "
+        f"ORDER BY {_check_column(order_by)} {direction}, id {direction}",
+        params,
+    )
+    ids = array("q")
+    while True:
+        batch = cur.fetchmany(_INSERT_BATCH_ROWS)
+        if not batch:
+            break
+        ids.extend(r[0] for r in batch)
+    return ids
+
+
+def fetch_hits(conn: sqlite3.Connection, ids: Sequence[int]) -> List[Tuple[Any, ...]]:
+    """Rows (HIT_VIEW_COLUMNS values) for the given hit ids, in the order given."""
+    by_id: Dict[int, Tuple[Any, ...]] = {}
+    select = f"SELECT id, {', '.join(HIT_VIEW_COLUMNS)} FROM hits WHERE id IN "
+    for i in range(0, len(ids), _FETCH_BATCH_IDS):
+        chunk = list(ids[i:i + _FETCH_BATCH_IDS])
+        for row in conn.execute(select + f"({', '.join('?' * len(chunk))})", chunk):
+            by_id[row[0]] = row[1:]
+    return [by_id[i] for i in ids]
+
+
+def iter_scan_hits(conn: sqlite3.Connection, scan_id: int) -> Iterator[Dict[str, Any]]:
+    """One scan's hits as report row dicts, in file order."""
+    cur = conn.execute(
+        f"SELECT {', '.join(HIT_VIEW_COLUMNS)} FROM hits WHERE scan_id = ? ORDER BY hit_index",
+        (scan_id,),
+    )
+    for row in cur:
+        yield dict(zip(HIT_VIEW_COLUMNS, row))
+
+
+def distinct_hit_values(conn: sqlite3.Connection, scan_id: int, column: str) -> List[Any]:
+    """Sorted distinct values of a hits column within one scan (e.g. for filter lists)."""
+    return [
+        r[0]
+        for r in conn.execute(
+            f"SELECT DISTINCT {_check_column(column)} FROM hits WHERE scan_id = ? ORDER BY 1",
+            (scan_id,),
+        )
+    ]
+
+
+def remove_report_db(db_path: str) -> None:
+    """Deletes a report database file and its WAL side files (connections must be closed)."""
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(db_path + suffix)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,217 @@
+"""
+MCD Target Hunter - Incremental Rescan
+
+Purpose:
+    Rescan NC files that are still being appended to (e.g. while the post-
+    processor is writing them) without starting over: the byte offset and
+    context tracker state at the end of each scan are saved, and the next
+    scan resumes from there and reports only the new hits.
+
+Storage:
+    - One JSON state file per (file path, search settings) under the
+      config dir ("incremental" folder)
+
+Notes:
+    - Only complete lines are scanned; a trailing partial line is picked up
+      by the next run once its newline has been written
+    - If the already-scanned part of the file changed (truncated or
+      rewritten anywhere), the scan starts over from the beginning: each
+      resume re-hashes that part, which costs a read but far less than
+      rescanning it
+    - Requires the bytes engine (ASCII search text, LF/CRLF line endings)
+"""
+
+import hashlib
+import json
+import os
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Dict, Any, Tuple, Callable
+
+from .mcd_hunter_core import (
+    Targets,
+    get_config_dir,
+    normalize_targets,
+    _BytesScanner,
+    _FieldExtractor,
+    _ScanProgress,
+    _iter_mmap_scan,
+    _is_ascii,
+    _has_lf_line_endings,
+)
+
+STATE_DIR_NAME = "incremental"
+
+_HASH_BLOCK_BYTES = 1 << 20
+
+
+@dataclass
+class IncrementalState:
+    input_path: str
+    settings: str
+    offset: int = 0
+    line_count: int = 0
+    hit_count: int = 0
+    prefix_hash: str = ""  # of bytes [0, offset)
+    last_parent: Optional[str] = None
+    last_op_no: Optional[str] = None
+    last_tool_change: Optional[str] = None
+    last_tool_number: Optional[str] = None
+
+
+def get_state_dir() -> str:
+    return os.path.join(get_config_dir(), STATE_DIR_NAME)
+
+
+def _settings_key(*search_args: Any) -> str:
+    return json.dumps(list(search_args))
+
+
+def _state_path(state_dir: str, input_path: str, settings: str) -> str:
+    digest = hashlib.blake2b(f"{input_path}\n{settings}".encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(state_dir, f"{digest}.json")
+
+
+def _update_hash(h, path: str, start: int, end: int) -> None:
+    """Feeds bytes [start, end) of the file into the hash object h."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(_HASH_BLOCK_BYTES, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+
+
+def _last_line_end(path: str, start: int, size: int) -> int:
+    """Offset just past the last newline in [start, size), or start if there is none."""
+    block = 64 * 1024
+    with open(path, "rb") as f:
+        end = size
+        while end > start:
+            begin = max(start, end - block)
+            f.seek(begin)
+            nl = f.read(end - begin).rfind(b"\n")
+            if nl >= 0:
+                return begin + nl + 1
+            end = begin
+    return start
+
+
+def load_incremental_state(state_file: str) -> Optional[IncrementalState]:
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return IncrementalState(**json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _prefix_hash(state: Optional[IncrementalState], input_path: str, size: int):
+    """
+    Hash object over the part of the file state says was scanned, if that
+    part is unchanged; None if the scan has to start over.
+    """
+    if state is None or state.offset > size:
+        return None
+    h = hashlib.blake2b(digest_size=16)
+    _update_hash(h, input_path, 0, state.offset)
+    return h if h.hexdigest() == state.prefix_hash else None
+
+
+def scan_file_incremental(
+    input_path: str,
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    use_regex: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+    state_dir: Optional[str] = None,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    Scans only what was appended to input_path since the previous
+    incremental scan with the same settings.
+
+    Returns (new_rows, total_hits, resumed): new_rows holds only the hits
+    found in this run (hit_index continues from earlier runs), total_hits
+    counts every hit in the file so far, and resumed is False when the scan
+    had to start from the beginning.
+    """
+    args = (target_text, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive)
+    if use_regex or not (
+        _is_ascii(*normalize_targets(target_text), parent_text if use_parent else "", op_no_text, tool_change_text)
+        and _has_lf_line_endings(input_path)
+    ):
+        raise ValueError("Incremental scans need plain (non-regex) ASCII search text and LF/CRLF line endings.")
+    if context_before > 0 or context_after > 0:
+        raise ValueError("Incremental scans do not support context lines (--context-before / --context-after).")
+
+    input_path = os.path.abspath(input_path)
+    settings = _settings_key(*args)
+    state_dir = state_dir or get_state_dir()
+    state_file = _state_path(state_dir, input_path, settings)
+
+    size = os.path.getsize(input_path)
+    state = load_incremental_state(state_file)
+    prefix = _prefix_hash(state, input_path, size)
+    resumed = prefix is not None
+    if not resumed:
+        state = IncrementalState(input_path, settings)
+        prefix = hashlib.blake2b(digest_size=16)
+
+    scanner = _BytesScanner(*args)
+    scanner.line_count = state.line_count
+    scanner.hit_count = state.hit_count
+    scanner.last_parent = state.last_parent
+    scanner.last_op_no = state.last_op_no
+    scanner.last_tool_change = state.last_tool_change
+    scanner.last_tool_number = state.last_tool_number
+
+    end = _last_line_end(input_path, state.offset, size)
+    tracker = _ScanProgress(size, progress, cancel)
+    advance = tracker.advance if (progress is not None or cancel is not None) else None
+
+    extract = _FieldExtractor(op_no_text, case_sensitive)
+    rows: List[Dict[str, Any]] = []
+    for row in _iter_mmap_scan(input_path, scanner, state.offset, end, advance):
+        rows.append(extract(row))
+        tracker.hits += 1
+
+    _update_hash(prefix, input_path, state.offset, end)
+    state.prefix_hash = prefix.hexdigest()
+    state.offset = end
+    state.line_count = scanner.line_count
+    state.hit_count = scanner.hit_count
+    state.last_parent = scanner.last_parent
+    state.last_op_no = scanner.last_op_no
+    state.last_tool_change = scanner.last_tool_change
+    state.last_tool_number = scanner.last_tool_number
+
+    os.makedirs(state_dir, exist_ok=True)
+    with open(state_file, "w", encoding="utf-8") as f:
+        json.dump(asdict(state), f, indent=2)
+
+    return rows, scanner.hit_count, resumed
+
+
+def reset_incremental_state(
+    input_path: str,
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    state_dir: Optional[str] = None,
+) -> None:
+    """Forgets the saved offset so the next incremental scan starts from the beginning."""
+    settings = _settings_key(target_text, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive)
+    state_file = _state_path(state_dir or get_state_dir(), os.path.abspath(input_path), settings)
+    if os.path.isfile(state_file):
+        os.remove(state_file)
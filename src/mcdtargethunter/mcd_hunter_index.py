@@ -0,0 +1,310 @@
+"""
+MCD Target Hunter - Context Index
+
+Purpose:
+    Cache the position of every context change (parent, operation number,
+    tool change, tool number) per NC file, so a later search for a different
+    target only has to find the target lines and look their context up.
+
+Storage:
+    - SQLite database in the per-user config dir (context_index.sqlite)
+    - One entry per (file path, context search settings)
+    - Invalidated when the file's size, mtime or fast content hash changes
+    - At most INDEX_MAX_ENTRIES entries: entries for deleted files and the
+      least recently used ones are pruned whenever an index is saved
+
+Notes:
+    - Requires the bytes engine (ASCII search text, LF/CRLF line endings);
+      anything else falls back to a normal full scan
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from bisect import bisect_right
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Tuple, Callable
+
+from .mcd_hunter_core import (
+    TRACK_PARENT,
+    TRACK_OP_NO,
+    TRACK_TOOL_CHANGE,
+    TRACK_TOOL_NUMBER,
+    Targets,
+    get_config_dir,
+    normalize_targets,
+    scan_file_for_hits,
+    _BytesScanner,
+    _FieldExtractor,
+    _ScanProgress,
+    _iter_bytes_scan,
+    _is_ascii,
+    _has_lf_line_endings,
+)
+
+INDEX_DB_FILE_NAME = "context_index.sqlite"
+
+HASH_SAMPLE_BYTES = 1 << 20
+HASH_SAMPLES = 8
+
+# Entries (file + context settings) kept in the index database
+INDEX_MAX_ENTRIES = 64
+
+# Context tracker bit -> report column
+_KIND_COLUMNS = (
+    (TRACK_OP_NO, "operation_no_line"),
+    (TRACK_TOOL_NUMBER, "tool_number_line"),
+    (TRACK_TOOL_CHANGE, "tool_change_line"),
+    (TRACK_PARENT, "parent_line"),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    built_at TEXT NOT NULL,
+    UNIQUE (path, settings)
+);
+CREATE TABLE IF NOT EXISTS context_changes (
+    file_id INTEGER NOT NULL REFERENCES indexed_files(id) ON DELETE CASCADE,
+    line_number INTEGER NOT NULL,
+    bits INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_context_changes_file ON context_changes (file_id, line_number);
+"""
+
+# Columns added after the first release; existing databases are migrated on open
+_ADDED_COLUMNS = (
+    ("used_at", "TEXT"),
+)
+
+
+def get_index_db_path() -> str:
+    return os.path.join(get_config_dir(), INDEX_DB_FILE_NAME)
+
+
+def fast_content_hash(path: str) -> str:
+    """
+    Hashes the file size plus a handful of fixed-size samples (head, tail and
+    evenly spaced blocks in between). Small files are hashed in full.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    size = os.path.getsize(path)
+    h.update(size.to_bytes(8, "little"))
+
+    with open(path, "rb") as f:
+        if size <= HASH_SAMPLE_BYTES * (HASH_SAMPLES + 2):
+            h.update(f.read())
+        else:
+            last = size - HASH_SAMPLE_BYTES
+            for i in range(HASH_SAMPLES + 2):
+                f.seek(last * i // (HASH_SAMPLES + 1))
+                h.update(f.read(HASH_SAMPLE_BYTES))
+
+    return h.hexdigest()
+
+
+def _file_fingerprint(path: str) -> Tuple[int, int, str]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, fast_content_hash(path)
+
+
+def _settings_key(parent_text: str, use_parent: bool, op_no_text: str, tool_change_text: str, case_sensitive: bool) -> str:
+    return json.dumps([parent_text if use_parent else "", op_no_text, tool_change_text, bool(case_sensitive)])
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript(_SCHEMA)
+
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(indexed_files)")}
+    for column, sql_type in _ADDED_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE indexed_files ADD COLUMN {column} {sql_type}")
+    return conn
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class ContextIndex:
+    """
+    In-memory view of one file's context changes, answering "which context
+    line was current at line N" with a binary search per tracker.
+    """
+
+    def __init__(self, changes: List[Tuple[int, int, str]]):
+        self._lines: Dict[str, List[int]] = {col: [] for _, col in _KIND_COLUMNS}
+        self._texts: Dict[str, List[str]] = {col: [] for _, col in _KIND_COLUMNS}
+        for line_number, bits, text in sorted(changes, key=lambda c: c[0]):
+            for bit, col in _KIND_COLUMNS:
+                if bits & bit:
+                    self._lines[col].append(line_number)
+                    self._texts[col].append(text)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self._lines.values())
+
+    def context_at(self, line_number: int) -> Dict[str, str]:
+        """Context columns in effect at line_number (trackers on that line included)."""
+        ctx = {}
+        for col, lines in self._lines.items():
+            i = bisect_right(lines, line_number)
+            ctx[col] = self._texts[col][i - 1] if i else ""
+        return ctx
+
+
+def load_context_index(
+    conn: sqlite3.Connection,
+    input_path: str,
+    settings: str,
+    fingerprint: Tuple[int, int, str],
+) -> Optional[ContextIndex]:
+    """Returns the stored index if it is still valid for the file, dropping it if stale."""
+    row = conn.execute(
+        "SELECT id, size, mtime_ns, content_hash FROM indexed_files WHERE path = ? AND settings = ?",
+        (input_path, settings),
+    ).fetchone()
+    if row is None:
+        return None
+
+    file_id, size, mtime_ns, content_hash = row
+    if (size, mtime_ns, content_hash) != fingerprint:
+        with conn:
+            conn.execute("DELETE FROM indexed_files WHERE id = ?", (file_id,))
+        return None
+
+    changes = conn.execute(
+        "SELECT line_number, bits, text FROM context_changes WHERE file_id = ? ORDER BY line_number",
+        (file_id,),
+    ).fetchall()
+    with conn:
+        conn.execute("UPDATE indexed_files SET used_at = ? WHERE id = ?", (_now(), file_id))
+    return ContextIndex(changes)
+
+
+def save_context_index(
+    conn: sqlite3.Connection,
+    input_path: str,
+    settings: str,
+    fingerprint: Tuple[int, int, str],
+    changes: List[Tuple[int, int, str]],
+) -> None:
+    size, mtime_ns, content_hash = fingerprint
+    now = _now()
+    with conn:
+        conn.execute("DELETE FROM indexed_files WHERE path = ? AND settings = ?", (input_path, settings))
+        cur = conn.execute(
+            "INSERT INTO indexed_files (path, settings, size, mtime_ns, content_hash, built_at, used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (input_path, settings, size, mtime_ns, content_hash, now, now),
+        )
+        conn.executemany(
+            "INSERT INTO context_changes (file_id, line_number, bits, text) VALUES (?, ?, ?, ?)",
+            ((cur.lastrowid, ln, bits, text) for ln, bits, text in changes),
+        )
+    prune_context_index(conn)
+
+
+def prune_context_index(conn: sqlite3.Connection, max_entries: Optional[int] = None) -> int:
+    """
+    Drops entries for files that no longer exist, then all but the
+    max_entries (default INDEX_MAX_ENTRIES) most recently used ones.
+    Returns the number of entries dropped.
+    """
+    max_entries = INDEX_MAX_ENTRIES if max_entries is None else max_entries
+    entries = conn.execute(
+        "SELECT id, path FROM indexed_files ORDER BY COALESCE(used_at, built_at) DESC, id DESC"
+    ).fetchall()
+    live = [file_id for file_id, path in entries if os.path.isfile(path)]
+    keep = set(live[:max_entries])
+    drop = [(file_id,) for file_id, _ in entries if file_id not in keep]
+    if drop:
+        with conn:
+            conn.executemany("DELETE FROM indexed_files WHERE id = ?", drop)
+    return len(drop)
+
+
+def scan_file_for_hits_indexed(
+    input_path: str,
+    target_text: Targets,
+    parent_text: str,
+    use_parent: bool,
+    op_no_text: str,
+    tool_change_text: str,
+    case_sensitive: bool = False,
+    use_regex: bool = False,
+    context_before: int = 0,
+    context_after: int = 0,
+    index_db_path: Optional[str] = None,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    cancel: Optional[Callable[[], bool]] = None,
+) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """
+    Same rows as scan_file_for_hits(), using the persistent context index.
+
+    The first scan of a file (or of a changed file) is a normal full scan
+    that also records every context change into the index. Later scans with
+    the same context settings only search for the target and fill in
+    context from the index. Regex searches, non-ASCII search text and
+    bare-CR files bypass the index with a plain text scan; so do scans with
+    context_before / context_after lines, which the index does not hold.
+
+    Returns (rows, total_hits, used_index).
+    """
+    args = (target_text, parent_text, use_parent, op_no_text, tool_change_text, case_sensitive)
+    input_path = os.path.abspath(input_path)
+
+    if context_before > 0 or context_after > 0:
+        rows, total_hits = scan_file_for_hits(
+            input_path, *args, use_regex, context_before, context_after, progress=progress, cancel=cancel
+        )
+        return rows, total_hits, False
+
+    if use_regex or not (
+        _is_ascii(*normalize_targets(target_text), parent_text if use_parent else "", op_no_text, tool_change_text)
+        and _has_lf_line_endings(input_path)
+    ):
+        rows, total_hits = scan_file_for_hits(
+            input_path, *args, use_regex, backend="text", progress=progress, cancel=cancel
+        )
+        return rows, total_hits, False
+
+    settings = _settings_key(parent_text, use_parent, op_no_text, tool_change_text, case_sensitive)
+    fingerprint = _file_fingerprint(input_path)
+    tracker = _ScanProgress(fingerprint[0], progress, cancel)
+    advance = tracker.advance if (progress is not None or cancel is not None) else None
+
+    conn = _connect(index_db_path or get_index_db_path())
+    try:
+        index = load_context_index(conn, input_path, settings, fingerprint)
+
+        if index is None:
+            changes: List[Tuple[int, int, str]] = []
+            scanner = _BytesScanner(*args, on_context=lambda ln, bits, line: changes.append((ln, bits, line)))
+        else:
+            scanner = _BytesScanner(target_text, "", False, "", "", case_sensitive, track_tool_number=False)
+
+        extract = _FieldExtractor(op_no_text, case_sensitive)
+        rows: List[Dict[str, Any]] = []
+        for row in _iter_bytes_scan(input_path, scanner, advance):
+            if index is not None:
+                row.update(index.context_at(row["line_number"]))
+            rows.append(extract(row))
+            tracker.hits += 1
+
+        if index is None:
+            save_context_index(conn, input_path, settings, fingerprint, changes)
+    finally:
+        conn.close()
+
+    return rows, len(rows), index is not None
@@ -0,0 +1,187 @@
+"""
+MCD Target Hunter - Sparse Line Index
+
+Purpose:
+    Random access to the lines of huge NC files without reading them up
+    front: the file is memory-mapped and the byte offset of every
+    CHECKPOINT_LINES-th line is recorded, so any line is at most
+    CHECKPOINT_LINES newline searches away from a known offset.
+
+Input(s):
+    - Variations of .txt file ('.nc', '.V11', etc)
+
+Output(s):
+    - Text of a window of lines (used by the GUI NC viewer)
+
+Notes:
+    - Line numbers are 1-based and split on LF (CRLF), like the bytes scan
+      engine, so they match report line numbers; files with bare CR line
+      endings are split on CR
+    - build() may run on a background thread while lines are being read:
+      it only ever appends checkpoints. Lines past the indexed part are not
+      available until build() reaches them
+"""
+
+import mmap
+import os
+import re
+from array import array
+from typing import Callable, List, Optional
+
+from .mcd_hunter_core import _has_lf_line_endings
+
+CHECKPOINT_LINES = 4096
+
+# Longer lines are cut off for display
+MAX_VIEW_LINE_BYTES = 64 * 1024
+
+# build() reports progress / polls cancel after this many checkpoints
+_BUILD_STEP_CHECKPOINTS = 256
+
+
+def _decode_view_line(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("cp1252", errors="replace")
+
+
+class SparseLineIndex:
+    """
+    Checkpointed line offsets over a memory-mapped file.
+
+    checkpoints[k] is the byte offset of line k * checkpoint_lines + 1.
+    Opening is constant time; call build() (typically on a worker thread)
+    to index the file, then read_lines() for any window of lines.
+    """
+
+    def __init__(self, path: str, checkpoint_lines: int = CHECKPOINT_LINES):
+        self.path = path
+        self.checkpoint_lines = checkpoint_lines
+        self.checkpoints = array("q", [0])
+        self.line_count: Optional[int] = None  # known once build() has finished
+
+        self._file = open(path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self._sep = b"\n" if _has_lf_line_endings(path) else b"\r"
+
+        # One match skips exactly checkpoint_lines lines, inside the regex engine
+        self._skip_block = re.compile(
+            b"(?:[^" + self._sep + b"]*" + self._sep + b"){" + str(checkpoint_lines).encode("ascii") + b"}"
+        ).match
+
+        if self._mm is None:
+            self.line_count = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.line_count is not None
+
+    @property
+    def indexed_lines(self) -> int:
+        """Lines that can be read right now."""
+        if self.line_count is not None:
+            return self.line_count
+        return len(self.checkpoints) * self.checkpoint_lines
+
+    def estimated_line_count(self) -> int:
+        """Exact once indexed; until then extrapolated from the indexed part (or the file's head)."""
+        if self.line_count is not None:
+            return self.line_count
+        if len(self.checkpoints) > 1:
+            bytes_per_line = self.checkpoints[-1] / ((len(self.checkpoints) - 1) * self.checkpoint_lines)
+        else:
+            head = self._mm[:1 << 20]
+            bytes_per_line = len(head) / max(1, head.count(self._sep))
+        return max((len(self.checkpoints) - 1) * self.checkpoint_lines + 1, int(self.size / bytes_per_line))
+
+    def build(
+        self,
+        cancel: Optional[Callable[[], bool]] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> bool:
+        """
+        Indexes the rest of the file. progress, if given, is called with the
+        bytes indexed so far; cancel is polled at the same points.
+
+        Returns True once the index is complete, False if cancelled.
+        """
+        if self.line_count is not None:
+            return True
+
+        mm = self._mm
+        skip_block = self._skip_block
+        pos = self.checkpoints[-1]
+        step = 0
+        while True:
+            m = skip_block(mm, pos)
+            if m is None:
+                break
+            pos = m.end()
+            if pos >= self.size:
+                break  # the file ends exactly on a checkpoint boundary
+            self.checkpoints.append(pos)
+
+            step += 1
+            if step == _BUILD_STEP_CHECKPOINTS:
+                step = 0
+                if cancel is not None and cancel():
+                    return False
+                if progress is not None:
+                    progress(pos)
+
+        blocks = len(self.checkpoints) - 1
+        if pos >= self.size and m is not None:
+            self.line_count = (blocks + 1) * self.checkpoint_lines
+        else:
+            tail = mm[pos:]
+            partial = 1 if tail and not tail.endswith(self._sep) else 0
+            self.line_count = blocks * self.checkpoint_lines + tail.count(self._sep) + partial
+
+        if progress is not None:
+            progress(self.size)
+        return True
+
+    def line_offset(self, line_number: int) -> Optional[int]:
+        """Byte offset where the 1-based line starts, or None if it isn't indexed yet / doesn't exist."""
+        if line_number < 1 or self._mm is None:
+            return None
+        if self.line_count is not None and line_number > self.line_count:
+            return None
+
+        block, skip = divmod(line_number - 1, self.checkpoint_lines)
+        if block >= len(self.checkpoints):
+            return None
+
+        pos = self.checkpoints[block]
+        for _ in range(skip):
+            nl = self._mm.find(self._sep, pos)
+            if nl < 0:
+                return None
+            pos = nl + 1
+        return pos if pos < self.size else None
+
+    def read_lines(self, first_line: int, count: int) -> List[str]:
+        """Up to count lines starting at the 1-based first_line, without line breaks."""
+        pos = self.line_offset(first_line)
+        if pos is None:
+            return []
+
+        mm = self._mm
+        lines: List[str] = []
+        while len(lines) < count and pos < self.size:
+            nl = mm.find(self._sep, pos)
+            end = self.size if nl < 0 else nl
+            raw = mm[pos:min(end, pos + MAX_VIEW_LINE_BYTES)]
+            if self._sep == b"\n" and raw.endswith(b"\r"):
+                raw = raw[:-1]
+            lines.append(_decode_view_line(raw))
+            pos = end + 1
+        return lines
+
+    def close(self) -> None:
+        """Releases the map; build() must not be running."""
+        if self._mm is not None:
+            self._mm.close()
+        self._file.close()
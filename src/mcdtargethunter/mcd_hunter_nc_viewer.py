@@ -0,0 +1,256 @@
+"""
+MCD Target Hunter - NC Source Viewer
+
+Purpose:
+    Read-only viewer for (multi-GB) NC files, so a hit can be inspected in
+    place instead of opening the whole file in an editor.
+
+Input(s):
+    - Variations of .txt file ('.nc', '.V11', etc)
+
+Output(s):
+    - None (display only)
+
+Notes:
+    - Opens instantly: the file is memory-mapped and its sparse line index
+      (mcd_hunter_line_index.py) is built on a worker thread
+    - Only the lines that fit in the window are read and rendered; the
+      scroll bar works in line numbers
+    - jump_to_line() highlights the hit line and the target text in it; a
+      jump past the indexed part waits until indexing gets there
+"""
+
+from typing import Optional, Tuple
+
+from PyQt6.QtCore import Qt, QEvent, QThread, pyqtSignal
+from PyQt6.QtGui import QColor, QFontDatabase, QTextCharFormat, QTextCursor, QTextFormat
+from PyQt6.QtWidgets import (
+    QWidget, QLabel, QLineEdit, QPushButton, QPlainTextEdit, QScrollBar,
+    QHBoxLayout, QVBoxLayout, QTextEdit
+)
+
+from .mcd_hunter_line_index import SparseLineIndex
+
+_HIT_LINE_COLOR = QColor(255, 243, 176)
+_TARGET_COLOR = QColor(255, 196, 0)
+
+# Lines moved per wheel notch
+_WHEEL_LINES = 3
+
+
+class _IndexWorker(QThread):
+    progress = pyqtSignal("qint64")  # bytes indexed
+
+    def __init__(self, index: SparseLineIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+
+    def run(self):
+        self.index.build(cancel=self.isInterruptionRequested, progress=self.progress.emit)
+
+
+class NCViewerWindow(QWidget):
+    """
+    Top-level viewer window for one file. The text box only ever holds the
+    visible lines; scrolling (scroll bar, wheel, arrow / page keys) moves
+    top_line and re-renders.
+    """
+
+    def __init__(self, path: str, parent=None):
+        super().__init__(parent, Qt.WindowType.Window)
+        self.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        self.path = path
+        self.setWindowTitle(f"NC Viewer - {path}")
+        self.resize(1000, 700)
+
+        self.index = SparseLineIndex(path)
+        self.top_line = 1
+        self._highlight: Optional[Tuple[int, str]] = None  # (line_number, target text)
+        self._pending_jump: Optional[int] = None
+        self._shown = 0
+
+        self.text = QPlainTextEdit()
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.text.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.SystemFont.FixedFont))
+        self.text.installEventFilter(self)
+        self.text.viewport().installEventFilter(self)
+
+        self.scrollbar = QScrollBar(Qt.Orientation.Vertical)
+
+        self.goto_input = QLineEdit()
+        self.goto_input.setPlaceholderText("Line number")
+        self.goto_button = QPushButton("Go to line")
+        self.status_label = QLabel("Indexing...")
+
+        # Layout
+        root = QVBoxLayout()
+        view_row = QHBoxLayout()
+        view_row.setSpacing(0)
+        view_row.addWidget(self.text, 1)
+        view_row.addWidget(self.scrollbar)
+        root.addLayout(view_row, 1)
+
+        bottom_row = QHBoxLayout()
+        bottom_row.addWidget(self.status_label, 1)
+        bottom_row.addWidget(self.goto_input)
+        bottom_row.addWidget(self.goto_button)
+        root.addLayout(bottom_row)
+        self.setLayout(root)
+
+        # Signals
+        self.scrollbar.valueChanged.connect(self.on_scroll)
+        self.goto_button.clicked.connect(self.on_goto)
+        self.goto_input.returnPressed.connect(self.on_goto)
+
+        self.worker = _IndexWorker(self.index, self)
+        self.worker.progress.connect(self.on_index_progress)
+        self.worker.finished.connect(self.on_index_progress)
+        self.worker.start()
+
+        self._update_scroll_range()
+        self._render()
+
+    # Navigation
+
+    def jump_to_line(self, line_number: int, target_text: str = "") -> None:
+        """Scrolls line_number into view and highlights it (and target_text in it)."""
+        self._highlight = (line_number, target_text)
+        if not self.index.complete and line_number > self.index.indexed_lines:
+            self._pending_jump = line_number
+            self.status_label.setText(f"Indexing... will jump to line {line_number:,}")
+            return
+
+        self._pending_jump = None
+        top = max(1, line_number - self._visible_lines() // 3)
+        if top - 1 > self.scrollbar.maximum():
+            self.scrollbar.setMaximum(top - 1)  # the line count is still an estimate
+        if self.scrollbar.value() == top - 1:
+            self._render()
+        else:
+            self.scrollbar.setValue(top - 1)  # renders via on_scroll
+
+    def on_goto(self):
+        try:
+            line_number = int(self.goto_input.text().strip().replace(",", ""))
+        except ValueError:
+            return
+        self.jump_to_line(line_number)
+
+    def on_scroll(self, value: int):
+        self.top_line = value + 1
+        self._render()
+
+    def on_index_progress(self, *_):
+        self._update_scroll_range()
+        if self._pending_jump is not None and (
+            self.index.complete or self._pending_jump <= self.index.indexed_lines
+        ):
+            self.jump_to_line(*self._highlight)
+        else:
+            self._update_status()
+
+    def eventFilter(self, obj, event):
+        # The text box only holds the visible lines, so scrolling keys and the
+        # wheel have to move the window instead of the text box
+        if event.type() == QEvent.Type.Wheel and obj is self.text.viewport():
+            notches = event.angleDelta().y() / 120
+            self.scrollbar.setValue(self.scrollbar.value() - int(notches * _WHEEL_LINES))
+            return True
+        if event.type() == QEvent.Type.KeyPress and obj is self.text:
+            step = self._scroll_step(event)
+            if step is not None:
+                self.scrollbar.setValue(self.scrollbar.value() + step)
+                return True
+        return super().eventFilter(obj, event)
+
+    def _scroll_step(self, event) -> Optional[int]:
+        key = event.key()
+        ctrl = bool(event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        if key == Qt.Key.Key_Up:
+            return -1
+        if key == Qt.Key.Key_Down:
+            return 1
+        if key == Qt.Key.Key_PageUp:
+            return -self._visible_lines()
+        if key == Qt.Key.Key_PageDown:
+            return self._visible_lines()
+        if key == Qt.Key.Key_Home and ctrl:
+            return -self.scrollbar.value()
+        if key == Qt.Key.Key_End and ctrl:
+            return self.scrollbar.maximum() - self.scrollbar.value()
+        return None
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scroll_range()
+        self._render()
+
+    def closeEvent(self, event):
+        self.worker.requestInterruption()
+        self.worker.wait()
+        self.index.close()
+        super().closeEvent(event)
+
+    # Rendering
+
+    def _visible_lines(self) -> int:
+        line_height = max(1, self.text.fontMetrics().lineSpacing())
+        return max(1, self.text.viewport().height() // line_height)
+
+    def _update_scroll_range(self):
+        visible = self._visible_lines()
+        self.scrollbar.setPageStep(visible)
+        self.scrollbar.setMaximum(max(0, self.index.estimated_line_count() - visible))
+
+    def _update_status(self):
+        shown = self._shown
+        if self.index.complete:
+            total = f"{self.index.line_count:,}"
+        else:
+            total = f"~{self.index.estimated_line_count():,} (indexing...)"
+        if shown:
+            self.status_label.setText(f"Lines {self.top_line:,}-{self.top_line + shown - 1:,} of {total}")
+        else:
+            self.status_label.setText(f"Line {self.top_line:,} of {total}")
+
+    def _render(self):
+        lines = self.index.read_lines(self.top_line, self._visible_lines())
+        self._shown = len(lines)
+        self.text.setPlainText("\n".join(lines))
+        self.text.setExtraSelections(self._hit_selections())
+        self._update_status()
+
+    def _hit_selections(self):
+        if self._highlight is None:
+            return []
+        line_number, target_text = self._highlight
+        row = line_number - self.top_line
+        if not 0 <= row < self._shown:
+            return []
+
+        block = self.text.document().findBlockByNumber(row)
+
+        line_sel = QTextEdit.ExtraSelection()
+        line_sel.format.setBackground(_HIT_LINE_COLOR)
+        line_sel.format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+        line_sel.cursor = QTextCursor(block)
+        selections = [line_sel]
+
+        if target_text:
+            text = block.text().lower()
+            needle = target_text.lower()
+            start = text.find(needle)
+            while start >= 0:
+                cursor = QTextCursor(block)
+                cursor.setPosition(block.position() + start)
+                cursor.setPosition(block.position() + start + len(needle), QTextCursor.MoveMode.KeepAnchor)
+                target_sel = QTextEdit.ExtraSelection()
+                target_fmt = QTextCharFormat()
+                target_fmt.setBackground(_TARGET_COLOR)
+                target_sel.format = target_fmt
+                target_sel.cursor = cursor
+                selections.append(target_sel)
+                start = text.find(needle, start + len(needle))
+        return selections
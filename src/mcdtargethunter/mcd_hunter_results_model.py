@@ -0,0 +1,194 @@
+"""
+MCD Target Hunter - Results Table Model
+
+Purpose:
+    Show a scan's hits in the GUI without loading them all: a lazy
+    QAbstractTableModel over the hits of one scan in a SQLite results store
+    (the report database schema from mcd_hunter_db.py).
+
+Input(s):
+    - SQLite results store + scan id
+
+Output(s):
+    - Rows for a QTableView
+
+Notes:
+    - Sorting and filtering run in SQLite and only return hit ids; the ids
+      are the one per-hit cost held in memory (8 bytes each)
+    - Rows are exposed PAGE_ROWS at a time through canFetchMore()/fetchMore()
+      and read from the store a page at a time, keeping at most CACHE_PAGES
+      pages in memory
+"""
+
+import os
+import sqlite3
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from .mcd_hunter_core import get_config_dir
+from .mcd_hunter_db import HIT_VIEW_COLUMNS, query_hit_ids, fetch_hits, distinct_hit_values
+
+RESULTS_DB_FILE_NAME = "gui_results.sqlite"
+
+_HEADERS = {
+    "hit_index": "Hit",
+    "line_number": "Line",
+    "target_text": "Target",
+    "target_line": "Target line",
+    "operation_no": "Op no.",
+    "tool_number": "Tool",
+    "n_block": "N",
+    "operation_no_line": "Op-no line",
+    "tool_number_line": "Tool line",
+    "tool_change_line": "Tool change line",
+    "parent_line": "Parent line",
+    "context_before": "Lines before",
+    "context_after": "Lines after",
+}
+
+_NUMERIC_COLUMNS = frozenset({"hit_index", "line_number", "operation_no", "tool_number", "n_block"})
+
+
+def get_results_db_path() -> str:
+    return os.path.join(get_config_dir(), RESULTS_DB_FILE_NAME)
+
+
+class HitTableModel(QAbstractTableModel):
+    """
+    Read-only table of one scan's hits. Sorting (header clicks) and
+    set_filters() re-query the ids in SQLite and reset the view to the first
+    page; scrolling further fetches more rows on demand.
+    """
+
+    PAGE_ROWS = 1000
+    CACHE_PAGES = 32
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._scan_id: Optional[int] = None
+        self._order_by = "hit_index"
+        self._descending = False
+        self._filters: Dict[str, Any] = {}
+
+        self._ids = array("q")
+        self._loaded = 0
+        self._pages: "OrderedDict[int, List[Tuple[Any, ...]]]" = OrderedDict()
+
+    # Store
+
+    def set_scan(self, db_path: str, scan_id: int) -> None:
+        """Shows the hits of scan_id from the results store at db_path."""
+        self.beginResetModel()
+        self._close()
+        self._conn = sqlite3.connect(db_path)
+        self._scan_id = scan_id
+        self._filters = {}
+        self._requery()
+        self.endResetModel()
+
+    def clear(self) -> None:
+        """Empties the table and closes the store (e.g. before it is rebuilt)."""
+        self.beginResetModel()
+        self._close()
+        self._ids = array("q")
+        self._loaded = 0
+        self.endResetModel()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._scan_id = None
+        self._pages.clear()
+
+    def _requery(self) -> None:
+        self._pages.clear()
+        if self._conn is None:
+            self._ids = array("q")
+        else:
+            self._ids = query_hit_ids(self._conn, self._scan_id, self._order_by, self._descending, self._filters)
+        self._loaded = min(self.PAGE_ROWS, len(self._ids))
+
+    # Filtering
+
+    def distinct_values(self, column: str) -> List[Any]:
+        if self._conn is None:
+            return []
+        return distinct_hit_values(self._conn, self._scan_id, column)
+
+    def set_filters(self, filters: Dict[str, Any]) -> None:
+        """Restricts the rows to hits whose columns equal the given values (None matches blank)."""
+        self.beginResetModel()
+        self._filters = dict(filters)
+        self._requery()
+        self.endResetModel()
+
+    def hit_at(self, row: int) -> Dict[str, Any]:
+        """The hit shown in the given table row, as a column -> value dict."""
+        return dict(zip(HIT_VIEW_COLUMNS, self._row(row)))
+
+    def matching_rows(self) -> int:
+        """Rows matching the current filters, whether fetched yet or not."""
+        return len(self._ids)
+
+    # QAbstractTableModel
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(HIT_VIEW_COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < len(self._ids)
+
+    def fetchMore(self, parent=QModelIndex()) -> None:
+        count = min(self.PAGE_ROWS, len(self._ids) - self._loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return _HEADERS[HIT_VIEW_COLUMNS[section]]
+        return section + 1
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = HIT_VIEW_COLUMNS[index.column()]
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            value = self._row(index.row())[index.column()]
+            return "" if value is None else value
+        if role == Qt.ItemDataRole.TextAlignmentRole and column in _NUMERIC_COLUMNS:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        self.beginResetModel()
+        self._order_by = HIT_VIEW_COLUMNS[column]
+        self._descending = order == Qt.SortOrder.DescendingOrder
+        self._requery()
+        self.endResetModel()
+
+    def _row(self, row: int) -> Tuple[Any, ...]:
+        page_no = row // self.PAGE_ROWS
+        page = self._pages.get(page_no)
+        if page is None:
+            start = page_no * self.PAGE_ROWS
+            page = fetch_hits(self._conn, self._ids[start:start + self.PAGE_ROWS])
+            self._pages[page_no] = page
+            if len(self._pages) > self.CACHE_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page_no)
+        return page[row % self.PAGE_ROWS]
@@ -0,0 +1,378 @@
+"""
+MCD Target Hunter - Scan Server
+
+Purpose:
+    Long-running scan process for integrations (e.g. MES) that would
+    otherwise start a new interpreter per scan: accepts scan requests over
+    a local HTTP/JSON API and streams the hits back as NDJSON.
+
+Input(s):
+    - POST /scan with a JSON object: input_path plus any search settings
+      (see SCAN_REQUEST_FIELDS); settings left out come from the config
+    - GET /health
+
+Output(s):
+    - NDJSON: one hit row per line, then {"done": true, "total_hits": ...}
+      (or {"error": ...} if the scan fails part way)
+
+Notes:
+    - Listens on 127.0.0.1 only, or on a Unix socket (--unix)
+    - Each request runs on its own thread; at most max_scans scans run at
+      once, further requests wait for a slot. A request's "workers" (processes
+      for one file) may not exceed the CPU count
+    - Stays warm between requests: compiled matchers and patterns, detected
+      file encodings and (with use_index) the persistent context index are
+      reused instead of rebuilt
+    - A client that disconnects stops its scan
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, Any, Iterator, Iterable
+
+from .mcd_hunter_core import (
+    __version__,
+    AppConfig,
+    SCAN_BACKENDS,
+    normalize_targets,
+    build_tracker_matcher,
+    iter_hits,
+)
+
+DEFAULT_PORT = 8765
+
+# JSON fields accepted by POST /scan besides input_path, with their types
+SCAN_REQUEST_FIELDS = {
+    "target_text": (str, list),
+    "parent_text": str,
+    "use_parent": bool,
+    "op_no_text": str,
+    "tool_change_text": str,
+    "case_sensitive": bool,
+    "use_regex": bool,
+    "context_before": int,
+    "context_after": int,
+    "backend": str,
+    "workers": int,
+    "use_index": bool,
+}
+
+# Largest request body accepted
+_MAX_BODY_BYTES = 1 << 20
+
+# Rows are sent in chunks of about this size
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+class ScanRequestError(ValueError):
+    """A scan request that cannot be run (reported as HTTP 400)."""
+
+
+def resolve_scan_request(request: Dict[str, Any], cfg: AppConfig) -> Dict[str, Any]:
+    """
+    Validates a /scan request and fills in missing settings from cfg.
+    Returns keyword arguments for iter_hits() (input_path included, plus
+    use_index) or raises ScanRequestError.
+    """
+    if not isinstance(request, dict):
+        raise ScanRequestError("Request body must be a JSON object.")
+
+    unknown = sorted(set(request) - set(SCAN_REQUEST_FIELDS) - {"input_path"})
+    if unknown:
+        raise ScanRequestError(f"Unknown field(s): {', '.join(unknown)}")
+    for name, expected in SCAN_REQUEST_FIELDS.items():
+        value = request.get(name)
+        # bool is an int subclass; don't let true/false through as counts
+        if value is not None and (
+            not isinstance(value, expected) or (expected is int and isinstance(value, bool))
+        ):
+            raise ScanRequestError(f"Field {name!r} has the wrong type.")
+
+    input_path = request.get("input_path")
+    if not isinstance(input_path, str) or not os.path.isfile(input_path):
+        raise ScanRequestError(f"Input file not found: {input_path}")
+
+    target_text = request.get("target_text", cfg.targets())
+    if isinstance(target_text, list) and not all(isinstance(t, str) for t in target_text):
+        raise ScanRequestError("target_text must be a non-blank string or list of strings.")
+    targets = normalize_targets(target_text)
+    if not targets:
+        raise ScanRequestError("target_text must be a non-blank string or list of strings.")
+
+    def setting(name: str) -> Any:
+        value = request.get(name)
+        return getattr(cfg, name) if value is None else value
+
+    scan = {
+        "input_path": os.path.abspath(input_path),
+        "target_text": targets[0] if len(targets) == 1 else targets,
+        "parent_text": setting("parent_text"),
+        "use_parent": setting("use_parent"),
+        "op_no_text": setting("op_no_text"),
+        "tool_change_text": setting("tool_change_text"),
+        "case_sensitive": setting("case_sensitive"),
+        "use_regex": setting("use_regex"),
+        "context_before": setting("context_before"),
+        "context_after": setting("context_after"),
+        "backend": request.get("backend") or "auto",
+        "workers": 1 if request.get("workers") is None else request["workers"],
+        "use_index": bool(request.get("use_index")),
+    }
+
+    if scan["context_before"] < 0 or scan["context_after"] < 0:
+        raise ScanRequestError("Context line counts cannot be negative.")
+    max_workers = os.cpu_count() or 1
+    if not 1 <= scan["workers"] <= max_workers:
+        raise ScanRequestError(f"workers must be between 1 and {max_workers}.")
+    if scan["backend"] not in SCAN_BACKENDS:
+        raise ScanRequestError(f"Unknown scan backend: {scan['backend']!r}")
+    try:
+        # Compiles (and caches) the matcher up front so bad patterns fail with a 400
+        build_tracker_matcher(
+            scan["target_text"],
+            scan["parent_text"],
+            scan["use_parent"],
+            scan["op_no_text"],
+            scan["tool_change_text"],
+            scan["case_sensitive"],
+            scan["use_regex"],
+        )
+    except ValueError as e:
+        raise ScanRequestError(str(e))
+
+    return scan
+
+
+def iter_scan_rows(scan: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Rows for a request resolved by resolve_scan_request(). Streams straight
+    from iter_hits(), except with use_index: the context index lookup builds
+    the whole row list before the first row is returned.
+    """
+    scan = dict(scan)
+    input_path = scan.pop("input_path")
+    if scan.pop("use_index"):
+        from .mcd_hunter_index import scan_file_for_hits_indexed
+
+        scan.pop("backend")
+        scan.pop("workers")
+        rows, _, _ = scan_file_for_hits_indexed(input_path, **scan)
+        return iter(rows)
+    return iter_hits(input_path, **scan)
+
+
+class _ScanHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = f"MCDTargetHunter/{__version__}"
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+        self._send_json(200, {
+            "status": "ok",
+            "version": __version__,
+            "active_scans": self.server.active_scans,
+            "max_scans": self.server.max_scans,
+        })
+
+    def do_POST(self):
+        if self.path != "/scan":
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+
+        try:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self.close_connection = True
+                raise ScanRequestError("Invalid Content-Length.")
+            if length > _MAX_BODY_BYTES:
+                # The body is left unread, so the connection can't be reused
+                self.close_connection = True
+                raise ScanRequestError("Request body too large.")
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                raise ScanRequestError("Request body is not valid JSON.")
+            scan = resolve_scan_request(request, self.server.config)
+        except ScanRequestError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        with self.server.scan_slot():
+            self._stream_scan(scan)
+
+    def _stream_scan(self, scan: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+
+        # Pull the first row before answering, so setup errors are still a 400
+        try:
+            rows = iter_scan_rows(scan)
+            first = next(rows, None)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": str(e) or e.__class__.__name__})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        total_hits = 0
+        try:
+            buf = []
+            size = 0
+            for row in _prepend(first, rows):
+                line = json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n"
+                buf.append(line)
+                size += len(line)
+                total_hits += 1
+                if size >= _STREAM_CHUNK_BYTES:
+                    self._write_chunk(b"".join(buf))
+                    buf, size = [], 0
+            buf.append(self._json_line({
+                "done": True,
+                "total_hits": total_hits,
+                "elapsed_s": round(time.perf_counter() - started, 3),
+            }))
+            self._write_chunk(b"".join(buf))
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            return
+        except Exception as e:
+            # Headers are out: report the failure in-stream instead
+            try:
+                self._write_chunk(self._json_line({"error": str(e) or e.__class__.__name__, "total_hits": total_hits}))
+            except OSError:
+                self.close_connection = True
+                return
+        finally:
+            close = getattr(rows, "close", None)
+            if close is not None:
+                close()  # stops the scan if the client went away
+
+        try:
+            self.wfile.write(b"0\r\n\r\n")
+        except OSError:
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+    @staticmethod
+    def _json_line(obj: Dict[str, Any]) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _send_json(self, status: int, obj: Dict[str, Any]) -> None:
+        body = self._json_line(obj)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def address_string(self) -> str:
+        # Unix-socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format: str, *args) -> None:
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def _prepend(first: Optional[Dict[str, Any]], rows: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    if first is None:
+        return
+    yield first
+    yield from rows
+
+
+class _ScanServerMixin:
+    """State shared by the TCP and Unix-socket servers."""
+
+    daemon_threads = True
+
+    def setup_scans(self, config: AppConfig, max_scans: int, quiet: bool) -> None:
+        self.config = config
+        self.max_scans = max_scans
+        self.quiet = quiet
+        self.active_scans = 0
+        self._slots = threading.BoundedSemaphore(max_scans)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def scan_slot(self):
+        """Holds one of the max_scans slots (waiting for one if needed)."""
+        with self._slots:
+            with self._lock:
+                self.active_scans += 1
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self.active_scans -= 1
+
+
+class ScanHTTPServer(_ScanServerMixin, ThreadingHTTPServer):
+    pass
+
+
+if hasattr(socket, "AF_UNIX"):
+    class ScanUnixServer(_ScanServerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+
+
+def remove_socket_file(path: str) -> bool:
+    """
+    Removes a (stale) Unix socket file at path. Returns False if nothing is
+    there; anything other than a socket is left alone and FileExistsError
+    is raised.
+    """
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return False
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"Not a socket, refusing to replace it: {path}")
+    os.remove(path)
+    return True
+
+
+def make_scan_server(
+    port: int = DEFAULT_PORT,
+    unix_socket: Optional[str] = None,
+    max_scans: int = 1,
+    config: Optional[AppConfig] = None,
+    quiet: bool = False,
+):
+    """
+    Creates (but does not start) the scan server: on 127.0.0.1:port, or on
+    the Unix socket path unix_socket (a stale socket file there is replaced;
+    any other file raises FileExistsError).
+    Call serve_forever() on the result; server_address gives the bound
+    address (port 0 picks a free port).
+    """
+    if unix_socket is not None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix sockets are not available on this platform.")
+        remove_socket_file(unix_socket)
+        server = ScanUnixServer(unix_socket, _ScanHandler)
+    else:
+        server = ScanHTTPServer(("127.0.0.1", port), _ScanHandler)
+    server.setup_scans(config or AppConfig.load(), max(1, max_scans), quiet)
+    return server
@@ -0,0 +1,430 @@
+"""
+MCD Target Hunter - Watch Folder
+
+Purpose:
+    Scan NC output as it arrives: watch a directory, wait until each new or
+    changed file has stopped changing, scan it in a bounded process pool
+    and write one CSV report per file.
+
+Output(s):
+    - CSV file(s)
+
+Storage:
+    - One text file of already-scanned content hashes per (watched dir,
+      output dir, search settings) under the config dir ("watch" folder)
+
+Notes:
+    - Linux uses inotify; elsewhere, or when inotify is unavailable, the
+      directory is polled. inotify does not see writes made by other hosts
+      on network shares, so use polling (--poll) when watching a share
+    - Events only mark a file as pending. It is scanned once its size and
+      mtime have stayed the same for `settle_s` seconds, so bursts of
+      events for one file are debounced into a single scan
+    - Report-named files in the output dir are ignored, so the output dir
+      may be the watched dir
+    - Every ready file is hashed (in the pool) before it is scanned; content
+      that was already scanned with the same settings is skipped, whatever
+      the file is called and across restarts
+"""
+
+import ctypes
+import ctypes.util
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import select
+import signal
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple, Callable, Iterable, Set
+
+from .mcd_hunter_core import (
+    get_config_dir,
+    scan_file_for_hits,
+    default_csv_report_path_in_dir,
+    write_csv_report,
+)
+from .mcd_hunter_batch import _unique_path
+
+STATE_DIR_NAME = "watch"
+
+# Seconds a file's size and mtime must stay unchanged before it is scanned
+DEFAULT_SETTLE_S = 2.0
+DEFAULT_POLL_INTERVAL_S = 1.0
+
+# Main loop wake-up interval while nothing happens
+_TICK_S = 0.25
+
+_HASH_CHUNK_BYTES = 1 << 20
+
+# Reports named by default_csv_report_path_in_dir() (plus _unique_path()'s
+# "_N" suffix); never picked up from the output dir, which may be watch_dir
+_REPORT_NAME = re.compile(r".*_MCDTargetHunter_\d{8}_\d{6}(?:_\d+)?\.csv\Z")
+
+# inotify(7)
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def get_watch_state_dir() -> str:
+    return os.path.join(get_config_dir(), STATE_DIR_NAME)
+
+
+def _list_files(watch_dir: str) -> Dict[str, Tuple[int, int]]:
+    """name -> (size, mtime_ns) for the regular files in watch_dir."""
+    files = {}
+    with os.scandir(watch_dir) as it:
+        for entry in it:
+            try:
+                if entry.is_file():
+                    st = entry.stat()
+                    files[entry.name] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass  # removed while listing
+    return files
+
+
+class _PollingSource:
+    """Lists the directory every interval and reports new or changed files."""
+
+    def __init__(self, watch_dir: str, interval_s: float = DEFAULT_POLL_INTERVAL_S):
+        self.watch_dir = watch_dir
+        self.interval_s = interval_s
+        self._snapshot = _list_files(watch_dir)
+        self._next = time.monotonic() + interval_s
+
+    def existing(self) -> List[str]:
+        return sorted(self._snapshot)
+
+    def changes(self, timeout_s: float) -> List[str]:
+        wait = self._next - time.monotonic()
+        if wait > timeout_s:
+            time.sleep(timeout_s)
+            return []
+        if wait > 0:
+            time.sleep(wait)
+        self._next = time.monotonic() + self.interval_s
+
+        snapshot = _list_files(self.watch_dir)
+        changed = [name for name, stat in snapshot.items() if self._snapshot.get(name) != stat]
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+
+class _InotifySource:
+    """Reports the files named by inotify events on the directory (Linux)."""
+
+    _MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE_SELF | _IN_MOVE_SELF
+
+    def __init__(self, watch_dir: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or None, use_errno=True)
+        self.watch_dir = watch_dir
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, os.fsencode(watch_dir), self._MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {watch_dir}")
+
+    def existing(self) -> List[str]:
+        return sorted(_list_files(self.watch_dir))
+
+    def changes(self, timeout_s: float) -> List[str]:
+        if not select.select([self._fd], [], [], timeout_s)[0]:
+            return []
+        try:
+            data = os.read(self._fd, 256 * 1024)
+        except BlockingIOError:
+            return []
+
+        names: Set[str] = set()
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            _, mask, _, name_len = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + name_len].rstrip(b"\0"))
+            pos += name_len
+
+            if mask & _IN_Q_OVERFLOW:
+                names.update(_list_files(self.watch_dir))  # events were lost: check everything
+            elif mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                raise OSError(f"Watched directory is gone: {self.watch_dir}")
+            elif name and not mask & _IN_ISDIR:
+                names.add(name)
+        return sorted(names)
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_change_source(watch_dir: str, poll: bool = False, poll_interval_s: float = DEFAULT_POLL_INTERVAL_S):
+    """inotify on Linux unless poll=True (or inotify is unavailable), otherwise directory polling."""
+    if not poll and sys.platform.startswith("linux"):
+        try:
+            return _InotifySource(watch_dir)
+        except (OSError, AttributeError):
+            pass  # no inotify (e.g. watch limit reached): fall back to polling
+    return _PollingSource(watch_dir, poll_interval_s)
+
+
+class SeenContent:
+    """
+    Set of content hashes already scanned, appended to a text file (one
+    hash per line) so it survives restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._hashes: Set[str] = set()
+        if path is not None:
+            try:
+                with open(path, "r", encoding="ascii") as f:
+                    self._hashes.update(line.strip() for line in f if line.strip())
+            except OSError:
+                pass
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self._hashes
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, content_hash: str) -> None:
+        if content_hash in self._hashes:
+            return
+        self._hashes.add(content_hash)
+        if self.path is not None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a", encoding="ascii") as f:
+                f.write(content_hash + "\n")
+
+
+def seen_content_path(watch_dir: str, output_dir: str, scan_kwargs: Dict[str, Any]) -> str:
+    key = json.dumps([watch_dir, output_dir, scan_kwargs], sort_keys=True)
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(get_watch_state_dir(), f"{digest}.txt")
+
+
+def file_content_hash(path: str) -> str:
+    """Full-content hash (unlike the sampled fast_content_hash, edits anywhere change it)."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_HASH_CHUNK_BYTES)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class WatchResult:
+    input_path: str
+    content_hash: str = ""
+    report_path: str = ""
+    total_hits: int = 0
+    skipped: bool = False  # content was already scanned
+    error: str = ""
+
+
+def _ignore_sigint() -> None:
+    # Ctrl+C reaches the whole process group; the main process shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _hash_one(input_path: str) -> Tuple[str, str]:
+    """Process-pool worker: (content_hash, error)."""
+    try:
+        return file_content_hash(input_path), ""
+    except Exception as e:
+        return "", str(e) or e.__class__.__name__
+
+
+def _scan_and_report(input_path: str, output_dir: str, scan_kwargs: Dict[str, Any]) -> Tuple[str, int, str]:
+    """Process-pool worker: scans one file and writes its report; (report_path, total_hits, error)."""
+    try:
+        rows, total_hits = scan_file_for_hits(input_path, **scan_kwargs)
+        report_path = _unique_path(default_csv_report_path_in_dir(input_path, output_dir))
+        write_csv_report(report_path, rows, total_hits)
+        return report_path, total_hits, ""
+    except Exception as e:
+        return "", 0, str(e) or e.__class__.__name__
+
+
+class _Pending:
+    __slots__ = ("stat", "changed_at")
+
+    def __init__(self, stat: Optional[Tuple[int, int]], changed_at: float):
+        self.stat = stat
+        self.changed_at = changed_at
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _is_readable(path: str) -> bool:
+    # A writer holding an exclusive lock (Windows) keeps the file unreadable
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+def watch_directory(
+    watch_dir: str,
+    output_dir: str,
+    scan_kwargs: Dict[str, Any],
+    workers: int = 1,
+    settle_s: float = DEFAULT_SETTLE_S,
+    patterns: Optional[Iterable[str]] = None,
+    include_existing: bool = False,
+    poll: bool = False,
+    poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+    seen: Optional[SeenContent] = None,
+    on_result: Optional[Callable[[WatchResult], None]] = None,
+    stop: Optional[Callable[[], bool]] = None,
+) -> int:
+    """
+    Watches watch_dir until stop() returns True (or KeyboardInterrupt) and
+    scans each file that appears or changes once it has settled. scan_kwargs
+    are passed to scan_file_for_hits(); reports go to output_dir.
+
+    patterns (fnmatch, e.g. "*.nc") limit which file names are picked up;
+    include_existing=True also queues the files already in the directory.
+    seen defaults to the persistent record for this watch_dir / output_dir /
+    scan_kwargs. At most `workers` hash or scan jobs run at once; on_result
+    is called with a WatchResult per finished (or skipped / failed) file.
+
+    Returns the number of files scanned.
+    """
+    watch_dir = os.path.abspath(watch_dir)
+    output_dir = os.path.abspath(output_dir)
+    patterns = list(patterns or [])
+    workers = max(1, workers)
+    if seen is None:
+        seen = SeenContent(seen_content_path(watch_dir, output_dir, scan_kwargs))
+
+    pending: Dict[str, _Pending] = {}  # changed files waiting to settle
+    ready: deque = deque()  # settled files waiting for a free worker
+    queued: Set[str] = set()  # paths in ready or being hashed / scanned
+    in_progress: Set[str] = set()  # content hashes being scanned
+    jobs: Dict[Future, Tuple[str, str, str]] = {}  # future -> (stage, path, content_hash)
+    scanned = 0
+
+    def wanted(path: str) -> bool:
+        name = os.path.basename(path)
+        if os.path.dirname(path) == output_dir and _REPORT_NAME.match(name):
+            return False  # one of our reports (or an earlier run's)
+        if not patterns:
+            return True
+        return any(fnmatch.fnmatch(name, p) for p in patterns)
+
+    def touch(path: str, now: float) -> None:
+        stat = _stat_key(path)
+        entry = pending.get(path)
+        if entry is None:
+            pending[path] = _Pending(stat, now)
+        elif entry.stat != stat:
+            entry.stat = stat
+            entry.changed_at = now
+
+    def report(result: WatchResult) -> None:
+        if on_result is not None:
+            on_result(result)
+
+    source = open_change_source(watch_dir, poll, poll_interval_s)
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_ignore_sigint)
+    try:
+        if include_existing:
+            now = time.monotonic()
+            for name in source.existing():
+                path = os.path.join(watch_dir, name)
+                if wanted(path):
+                    touch(path, now)
+
+        while stop is None or not stop():
+            now = time.monotonic()
+            for name in source.changes(_TICK_S if not jobs or len(jobs) >= workers else 0.05):
+                path = os.path.join(watch_dir, name)
+                if wanted(path):
+                    touch(path, now)
+
+            # Settled files move on to the ready queue
+            now = time.monotonic()
+            for path, entry in list(pending.items()):
+                if now - entry.changed_at < settle_s:
+                    continue
+                stat = _stat_key(path)
+                if stat is None or not wanted(path):
+                    del pending[path]  # deleted before it settled, or a report
+                elif stat != entry.stat:
+                    entry.stat, entry.changed_at = stat, now
+                elif path not in queued and _is_readable(path):
+                    del pending[path]
+                    ready.append(path)
+                    queued.add(path)
+
+            # Collect finished jobs
+            for future in [f for f in jobs if f.done()]:
+                stage, path, content_hash = jobs.pop(future)
+                if stage == "hash":
+                    content_hash, error = future.result()
+                    if error:
+                        queued.discard(path)
+                        report(WatchResult(path, error=error))
+                    elif content_hash in seen or content_hash in in_progress:
+                        queued.discard(path)
+                        report(WatchResult(path, content_hash, skipped=True))
+                    else:
+                        # Takes over the hash job's worker slot
+                        in_progress.add(content_hash)
+                        scan = pool.submit(_scan_and_report, path, output_dir, scan_kwargs)
+                        jobs[scan] = ("scan", path, content_hash)
+                else:
+                    report_path, total_hits, error = future.result()
+                    queued.discard(path)
+                    in_progress.discard(content_hash)
+                    if error:
+                        report(WatchResult(path, content_hash, error=error))
+                    else:
+                        seen.add(content_hash)
+                        scanned += 1
+                        report(WatchResult(path, content_hash, report_path, total_hits))
+
+            # Start hashing ready files while workers are free
+            while ready and len(jobs) < workers:
+                path = ready.popleft()
+                jobs[pool.submit(_hash_one, path)] = ("hash", path, "")
+
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    return scanned
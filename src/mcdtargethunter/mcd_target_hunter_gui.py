@@ -17,6 +17,10 @@ Key Features:
     - File picker for CNC/MCD output files (extension-agnostic)
     - Config persistence across runs (per-user/-machine)
     - CSV report generation with one row per hit
+    - Results table with sorting and operation / tool filters, read lazily
+      from an on-disk results store so any hit count opens instantly
+    - Built-in NC viewer that jumps to the selected hit (memory-mapped, opens
+      instantly on multi-GB files)
     - Optional quick-open of generated reports
 
 Design Notes:
@@ -45,20 +49,25 @@ import sys
 import ctypes
 from ctypes import wintypes
 
-from PyQt6.QtCore import QUrl
+from PyQt6.QtCore import Qt, QUrl, QThread, pyqtSignal
 from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton,
-    QFileDialog, QHBoxLayout, QVBoxLayout, QMessageBox, QCheckBox
+    QFileDialog, QHBoxLayout, QVBoxLayout, QMessageBox, QCheckBox,
+    QProgressBar, QComboBox, QTableView, QHeaderView, QSpinBox
 )
 
 from .mcd_hunter_core import (
     APP_NAME,
     AppConfig,
-    scan_file_for_hits,
+    ScanCancelled,
+    iter_hits,
     default_csv_report_path_in_dir,
     write_csv_report,
 )
+from .mcd_hunter_db import open_report_db, append_scan_to_db, iter_scan_hits, remove_report_db
+from .mcd_hunter_results_model import HitTableModel, get_results_db_path
+from .mcd_hunter_nc_viewer import NCViewerWindow
 
 
 def get_windows_desktop_path() -> str:
@@ -109,11 +118,80 @@ def get_windows_desktop_path() -> str:
     return os.path.join(os.path.expanduser("~"), "Desktop")
 
 
+class ScanWorker(QThread):
+    """
+    Runs scan + CSV report off the GUI thread.
+
+    Progress is forwarded from the core's progress callback; cancellation
+    uses QThread's interruption flag, which the core polls once per chunk.
+    """
+
+    progress = pyqtSignal("qint64", "qint64", int)  # bytes_done, total_bytes, hits so far
+    results_ready = pyqtSignal(str, "qint64")  # results store path, scan_id
+    succeeded = pyqtSignal(str, int)  # report_path, total_hits
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, config: AppConfig, parent=None):
+        super().__init__(parent)
+        self.config = config
+
+    def run(self):
+        cfg = self.config
+        db_path = get_results_db_path()
+        try:
+            # Hits stream straight into the on-disk results store that backs
+            # the results table, so memory stays flat whatever the hit count
+            remove_report_db(db_path)
+            conn = open_report_db(db_path)
+            try:
+                rows = iter_hits(
+                    cfg.input_file_path,
+                    cfg.targets(),
+                    cfg.parent_text,
+                    cfg.use_parent,
+                    cfg.op_no_text,
+                    cfg.tool_change_text,
+                    cfg.case_sensitive,
+                    use_regex=cfg.use_regex,
+                    context_before=cfg.context_before,
+                    context_after=cfg.context_after,
+                    progress=self.progress.emit,
+                    cancel=self.isInterruptionRequested,
+                )
+                settings = {
+                    "target_text": cfg.targets(),
+                    "parent_text": cfg.parent_text,
+                    "use_parent": cfg.use_parent,
+                    "op_no_text": cfg.op_no_text,
+                    "tool_change_text": cfg.tool_change_text,
+                    "case_sensitive": cfg.case_sensitive,
+                    "use_regex": cfg.use_regex,
+                    "context_before": cfg.context_before,
+                    "context_after": cfg.context_after,
+                }
+                scan_id, total_hits = append_scan_to_db(conn, cfg.input_file_path, rows, settings)
+
+                report_path = default_csv_report_path_in_dir(cfg.input_file_path, cfg.output_dir_path)
+                write_csv_report(report_path, iter_scan_hits(conn, scan_id), total_hits)
+            finally:
+                conn.close()
+
+            self.results_ready.emit(db_path, scan_id)
+            self.succeeded.emit(report_path, total_hits)
+
+        except ScanCancelled:
+            self.cancelled.emit()
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
 class MainWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle(APP_NAME + " - " + f"v{__version__}")
         self.setMinimumWidth(820)
+        self.resize(1100, 900)
 
         self.config = AppConfig.load()
 
@@ -140,6 +218,9 @@ class MainWindow(QWidget):
         self.target_label = QLabel("Target (child) search text:")
         self.target_input = QLineEdit(self.config.target_text)
 
+        self.extra_targets_label = QLabel("Additional targets, scanned in the same pass (separate with ;):")
+        self.extra_targets_input = QLineEdit("; ".join(self.config.extra_target_texts))
+
         self.parent_label = QLabel("Parent search text:")
         self.parent_input = QLineEdit(self.config.parent_text)
 
@@ -155,10 +236,54 @@ class MainWindow(QWidget):
         self.case_checkbox = QCheckBox("Case sensitive search")
         self.case_checkbox.setChecked(self.config.case_sensitive)
 
+        self.regex_checkbox = QCheckBox("Regular expressions (all search texts)")
+        self.regex_checkbox.setChecked(self.config.use_regex)
+
+        self.context_label = QLabel("Context lines before / after each hit:")
+        self.context_before_spin = QSpinBox()
+        self.context_before_spin.setRange(0, 1000)
+        self.context_before_spin.setValue(self.config.context_before)
+        self.context_after_spin = QSpinBox()
+        self.context_after_spin.setRange(0, 1000)
+        self.context_after_spin.setValue(self.config.context_after)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1000)
+        self.progress_bar.setTextVisible(False)
+        self.status_label = QLabel("Ready.")
+
         self.run_button = QPushButton("Run")
         self.cancel_button = QPushButton("Cancel")
         self.about_button = QPushButton("About")
 
+        # Results
+        self.results_label = QLabel("Results:")
+        self.op_filter_label = QLabel("Operation:")
+        self.op_filter = QComboBox()
+        self.tool_filter_label = QLabel("Tool:")
+        self.tool_filter = QComboBox()
+        self.open_report_btn = QPushButton("Open CSV Report")
+        self.open_folder_btn = QPushButton("Open Output Folder")
+        self.view_source_btn = QPushButton("View NC Source")
+
+        self.results_model = HitTableModel(self)
+        self.results_view = QTableView()
+        self.results_view.setModel(self.results_model)
+        self.results_view.setSortingEnabled(True)
+        self.results_view.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        self.results_view.setWordWrap(False)
+        self.results_view.horizontalHeader().setStretchLastSection(True)
+        # Fixed row heights: the view never has to measure rows it doesn't show
+        self.results_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.results_view.verticalHeader().hide()
+
+        self.report_path = None
+        self.results_input_path = None
+        self.viewer = None
+        self._set_results_controls_enabled(False)
+
+        self.worker = None
+
         # Layout
         root = QVBoxLayout()
 
@@ -182,6 +307,8 @@ class MainWindow(QWidget):
 
         root.addWidget(self.target_label)
         root.addWidget(self.target_input)
+        root.addWidget(self.extra_targets_label)
+        root.addWidget(self.extra_targets_input)
 
         root.addWidget(self.parent_label)
         root.addWidget(self.parent_input)
@@ -194,9 +321,35 @@ class MainWindow(QWidget):
         root.addWidget(self.toolchg_input)
 
         root.addWidget(self.case_checkbox)
+        root.addWidget(self.regex_checkbox)
+        context_row = QHBoxLayout()
+        context_row.addWidget(self.context_label)
+        context_row.addWidget(self.context_before_spin)
+        context_row.addWidget(self.context_after_spin)
+        context_row.addStretch(1)
+        root.addLayout(context_row)
 
         root.addSpacing(15)
 
+        root.addWidget(self.progress_bar)
+        root.addWidget(self.status_label)
+
+        root.addSpacing(10)
+
+        results_row = QHBoxLayout()
+        results_row.addWidget(self.results_label)
+        results_row.addSpacing(10)
+        results_row.addWidget(self.op_filter_label)
+        results_row.addWidget(self.op_filter)
+        results_row.addWidget(self.tool_filter_label)
+        results_row.addWidget(self.tool_filter)
+        results_row.addStretch(1)
+        results_row.addWidget(self.view_source_btn)
+        results_row.addWidget(self.open_report_btn)
+        results_row.addWidget(self.open_folder_btn)
+        root.addLayout(results_row)
+        root.addWidget(self.results_view, 1)
+
         self.about_button = QPushButton("About")
         btn_row = QHBoxLayout()
         btn_row.addWidget(self.about_button)
@@ -220,10 +373,22 @@ class MainWindow(QWidget):
         self.parent_input.setEnabled(self.use_parent_checkbox.isChecked())
 
         self.run_button.clicked.connect(self.on_run)
-        self.cancel_button.clicked.connect(self.close)
+        self.cancel_button.clicked.connect(self.on_cancel)
 
         self.about_button.clicked.connect(self.show_about)
 
+        self.op_filter.currentIndexChanged.connect(self.on_filter_changed)
+        self.results_view.selectionModel().currentRowChanged.connect(self.on_hit_selected)
+        self.results_view.doubleClicked.connect(lambda index: self.show_hit_in_viewer(index.row()))
+        self.view_source_btn.clicked.connect(self.on_view_source)
+        self.tool_filter.currentIndexChanged.connect(self.on_filter_changed)
+        self.open_report_btn.clicked.connect(
+            lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(self.report_path))
+        )
+        self.open_folder_btn.clicked.connect(
+            lambda: QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.dirname(self.report_path)))
+        )
+
     # Add "About" button and message
     def show_about(self):
         about_text = (
@@ -233,7 +398,7 @@ class MainWindow(QWidget):
             "Scan CNC/MCD output files for a target string and report each hit\n"
             "with useful context (operation name/no., tool number, tool change line).\n\n"
             "Output:\n"
-            "CSV report (one row per hit)\n\n"
+            "CSV report (one row per hit), also shown in the results table\n\n"
             "Notes:\n"
             "Built for troubleshooting CNC programming workflows."
         )
@@ -281,48 +446,147 @@ class MainWindow(QWidget):
         self.config.input_file_path = input_path
         self.config.output_dir_path = output_dir
         self.config.target_text = target_text
+        self.config.extra_target_texts = [
+            t.strip() for t in self.extra_targets_input.text().split(";") if t.strip()
+        ]
         self.config.parent_text = self.parent_input.text().strip()
         self.config.use_parent = self.use_parent_checkbox.isChecked()
         self.config.op_no_text = self.opno_input.text().strip()
         self.config.tool_change_text = self.toolchg_input.text().strip()
         self.config.case_sensitive = self.case_checkbox.isChecked()
+        self.config.use_regex = self.regex_checkbox.isChecked()
+        self.config.context_before = self.context_before_spin.value()
+        self.config.context_after = self.context_after_spin.value()
         self.config.save()
 
-        # Scan + write report
-        try:
-            rows, total_hits = scan_file_for_hits(
-                input_path,
-                self.config.target_text,
-                self.config.parent_text,
-                self.config.use_parent,
-                self.config.op_no_text,
-                self.config.tool_change_text,
-                self.config.case_sensitive,
-            )
-
-            report_path = default_csv_report_path_in_dir(input_path, output_dir)
-            write_csv_report(report_path, rows, total_hits)
-
-            msg = QMessageBox(self)
-            msg.setWindowTitle("Complete")
-            msg.setIcon(QMessageBox.Icon.Information)
-            msg.setText("Report created.")
-            msg.setInformativeText(f"Report path:\n{report_path}\n\nTotal hits: {total_hits}")
-
-            open_btn = msg.addButton("Open CSV Report", QMessageBox.ButtonRole.ActionRole)
-            folder_btn = msg.addButton("Open Output Folder", QMessageBox.ButtonRole.ActionRole)
-            msg.addButton("OK", QMessageBox.ButtonRole.AcceptRole)
-
-            msg.exec()
-
-            clicked = msg.clickedButton()
-            if clicked == open_btn:
-                QDesktopServices.openUrl(QUrl.fromLocalFile(report_path))
-            elif clicked == folder_btn:
-                QDesktopServices.openUrl(QUrl.fromLocalFile(output_dir))
+        # The worker rebuilds the results store; let go of the old one first.
+        # The file may have changed too, so close a viewer showing it.
+        self.results_model.clear()
+        if self.viewer is not None:
+            self.viewer.close()
+            self.viewer = None
+        self.results_input_path = input_path
+        self.report_path = None
+        self._set_results_controls_enabled(False)
+
+        # Scan + write report on a worker thread
+        self.run_button.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Scanning...")
+
+        self.worker = ScanWorker(AppConfig(**self.config.__dict__), self)
+        self.worker.progress.connect(self.on_scan_progress)
+        self.worker.results_ready.connect(self.on_results_ready)
+        self.worker.succeeded.connect(self.on_scan_succeeded)
+        self.worker.failed.connect(self.on_scan_failed)
+        self.worker.cancelled.connect(self.on_scan_cancelled)
+        self.worker.finished.connect(self.on_scan_finished)
+        self.worker.start()
+
+    # Cancel: stop a running scan, otherwise close the app
+    def on_cancel(self):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.status_label.setText("Cancelling...")
+        else:
+            self.close()
+
+    def closeEvent(self, event):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+        if self.viewer is not None:
+            self.viewer.close()
+        self.results_model.clear()
+        super().closeEvent(event)
+
+    def on_scan_progress(self, bytes_done: int, total_bytes: int, hits: int):
+        if total_bytes > 0:
+            self.progress_bar.setValue(int(bytes_done * 1000 / total_bytes))
+        mb = 1024 * 1024
+        self.status_label.setText(
+            f"Scanning... {bytes_done / mb:,.1f} of {total_bytes / mb:,.1f} MB - {hits:,} hits so far"
+        )
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Something went wrong:\n\n{e}")
+    def on_scan_finished(self):
+        self.run_button.setEnabled(True)
+        self.worker = None
+
+    def on_scan_cancelled(self):
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Scan cancelled. No report was written.")
+
+    def on_scan_failed(self, error: str):
+        self.status_label.setText("Scan failed.")
+        QMessageBox.critical(self, "Error", f"Something went wrong:\n\n{error}")
+
+    def on_scan_succeeded(self, report_path: str, total_hits: int):
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self.status_label.setText(f"Complete. Total hits: {total_hits:,} - report: {report_path}")
+        self.report_path = report_path
+        self.open_report_btn.setEnabled(True)
+        self.open_folder_btn.setEnabled(True)
+
+    def on_results_ready(self, db_path: str, scan_id: int):
+        self.results_model.set_scan(db_path, scan_id)
+        for combo, column in ((self.op_filter, "operation_no"), (self.tool_filter, "tool_number")):
+            combo.blockSignals(True)
+            combo.clear()
+            combo.addItem("All")
+            for value in self.results_model.distinct_values(column):
+                combo.addItem("(none)" if value is None else str(value), value)
+            combo.blockSignals(False)
+        self.op_filter.setEnabled(True)
+        self.tool_filter.setEnabled(True)
+        self.view_source_btn.setEnabled(True)
+        self._update_results_label()
+
+    # Selecting a hit jumps an open viewer to it; double-click / the button opens one
+    def on_hit_selected(self, current, previous):
+        if self.viewer is not None and current.isValid():
+            self.show_hit_in_viewer(current.row())
+
+    def on_view_source(self):
+        index = self.results_view.currentIndex()
+        if index.isValid():
+            self.show_hit_in_viewer(index.row())
+        else:
+            self._open_viewer()
+
+    def show_hit_in_viewer(self, row: int):
+        hit = self.results_model.hit_at(row)
+        self._open_viewer().jump_to_line(hit["line_number"], hit["target_text"])
+
+    def _open_viewer(self) -> NCViewerWindow:
+        if self.viewer is None:
+            self.viewer = NCViewerWindow(self.results_input_path)
+            self.viewer.destroyed.connect(self._on_viewer_destroyed)
+        self.viewer.show()
+        self.viewer.raise_()
+        return self.viewer
+
+    def _on_viewer_destroyed(self):
+        self.viewer = None
+
+    def on_filter_changed(self):
+        filters = {}
+        if self.op_filter.currentIndex() > 0:
+            filters["operation_no"] = self.op_filter.currentData()
+        if self.tool_filter.currentIndex() > 0:
+            filters["tool_number"] = self.tool_filter.currentData()
+        self.results_model.set_filters(filters)
+        self._update_results_label()
+
+    def _update_results_label(self):
+        self.results_label.setText(f"Results: {self.results_model.matching_rows():,} hits")
+
+    def _set_results_controls_enabled(self, enabled: bool):
+        for widget in (
+            self.op_filter, self.tool_filter, self.view_source_btn, self.open_report_btn, self.open_folder_btn
+        ):
+            widget.setEnabled(enabled)
+        if not enabled:
+            self.results_label.setText("Results:")
 
 
 def main():
@@ -0,0 +1,433 @@
+"""
+MCD Target Hunter - Scan Engine Equivalence Tests
+
+Purpose:
+    Pins the chunked readers and the alternative scan engines to their
+    simple reference (str.splitlines(), a whole-file decode, the text
+    engine). The chunk-size constants are patched down to a few bytes so
+    every line, multi-byte character and CRLF pair gets split somewhere.
+
+Notes:
+    - Inputs are generated from a fixed seed; a failure names the seed
+    - The encoding cache is redirected to a temp config dir
+"""
+
+import io
+import os
+import random
+import re
+
+import pytest
+
+from mcdtargethunter import mcd_hunter_core as core
+
+TOKENS = [
+    "POST-GENERATED", "post-generated", "OPERATION NAME", "OPERATION NO. = 12",
+    "M06", "m06", "T12", "t 3", "TOOL NO. 4", "TOOL CALL 9", "X1.0", "G01",
+    "  ", "N10", "Tx", "é", "\t",
+]
+
+SCAN_SETTINGS = dict(
+    target_text="POST-GENERATED",
+    parent_text="OPERATION NAME",
+    use_parent=True,
+    op_no_text="OPERATION NO. =",
+    tool_change_text="M06",
+)
+
+SEEDS = range(150)
+
+
+@pytest.fixture(autouse=True)
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "appdata"))
+
+
+def make_nc_file(path, seed: int) -> None:
+    """Writes a random UTF-8 NC-like file (LF or CRLF) built from TOKENS."""
+    rnd = random.Random(seed)
+    lines = [
+        " ".join(rnd.choice(TOKENS) for _ in range(rnd.randint(0, 4)))
+        for _ in range(rnd.randint(0, 60))
+    ]
+    newline = rnd.choice(["\n", "\r\n"])
+    data = newline.join(lines) + rnd.choice(["", newline])
+    path.write_bytes(data.encode("utf-8"))
+
+
+def scan(path, **kwargs):
+    rows, total = core.scan_file_for_hits(str(path), **SCAN_SETTINGS, **kwargs)
+    assert total == len(rows)
+    return rows
+
+
+def random_chunks(text: str, rnd: random.Random):
+    pos = 0
+    while pos < len(text):
+        step = rnd.randint(0, 4)  # empty chunks included
+        yield text[pos:pos + step]
+        pos += step
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_split_chunked_lines_matches_splitlines(seed):
+    rnd = random.Random(seed)
+    pieces = ["ab", "x", "\n", "\r", "\r\n", "\x0b", "\x85", " ", "é", ""]
+    text = "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 40)))
+
+    assert list(core._split_chunked_lines(random_chunks(text, rnd))) == text.splitlines()
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 2, 3, 7])
+@pytest.mark.parametrize("seed", range(40))
+def test_decoded_chunks_match_whole_file_decode(seed, chunk_bytes, monkeypatch):
+    monkeypatch.setattr(core, "READ_CHUNK_BYTES", chunk_bytes)
+    rnd = random.Random(seed)
+    pieces = ["é", "€", "𝄞", "abc", "\r\n"]
+    text = "".join(rnd.choice(pieces) for _ in range(rnd.randint(0, 20)))
+    data = text.encode("utf-8")
+    if rnd.random() < 0.5:
+        cut = rnd.randint(0, len(data))
+        data = data[:cut] + b"\xb0" + data[cut:]
+
+    try:
+        expected, fallback = data.decode("utf-8"), None
+    except UnicodeDecodeError as e:
+        expected = data[:e.start].decode("utf-8") + data[e.start:].decode("cp1252", errors="replace")
+        fallback = e.start
+
+    detected = {}
+    decoded = "".join(core._iter_decoded_chunks(io.BytesIO(data), detected))
+    assert decoded == expected
+    assert detected.get("fallback_offset") == fallback
+
+    if fallback is not None:
+        # Replaying the cached offset gives the same text without probing
+        replayed = "".join(core._iter_decoded_chunks(io.BytesIO(data), {}, fallback))
+        assert replayed == expected
+
+
+def test_text_file_lines_reuse_cached_encoding(tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "READ_CHUNK_BYTES", 3)
+    path = tmp_path / "mixed.nc"
+    data = "Ä1\r\nT2 M06\r\n".encode("utf-8") + b"90\xb0\r\nPOST\xe9\r\n"
+    path.write_bytes(data)
+    fallback = data.index(b"\xb0")
+    expected = (data[:fallback].decode("utf-8") + data[fallback:].decode("cp1252")).splitlines()
+
+    assert core.get_cached_encoding(str(path)) is None
+    assert core.read_text_file_lines(str(path)) == expected
+    assert core.get_cached_encoding(str(path)) == core.DetectedEncoding("cp1252", fallback)
+    assert core.read_text_file_lines(str(path)) == expected
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 3, 64])
+@pytest.mark.parametrize("rewrite", [
+    b"\xb0\xb01 T2 M06\r\n90 \r\nPOST\xe9\r\n",  # invalid byte before the cached offset
+    "Ä1 T2 M06\r\n90é\r\nPOST\r\n".encode("utf-8"),  # valid UTF-8 at the cached offset
+    "Ä1 T2 M06\r\n90 \r\nPOST\r\n".encode("utf-8") + b"\xff",  # invalid only later
+])
+def test_text_file_lines_survive_rewrite_with_same_size_and_mtime(rewrite, chunk_bytes, tmp_path, monkeypatch):
+    monkeypatch.setattr(core, "READ_CHUNK_BYTES", chunk_bytes)
+    path = tmp_path / "rewritten.nc"
+    original = "Ä1 T2 M06\r\n".encode("utf-8") + b"90\xb0\r\nPOST\xe9\r\n"
+    assert len(rewrite) == len(original)
+    path.write_bytes(original)
+    core.read_text_file_lines(str(path))
+    cached = core.get_cached_encoding(str(path))
+    assert cached.fallback_offset == original.index(b"\xb0")
+
+    st = path.stat()
+    path.write_bytes(rewrite)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert core.get_cached_encoding(str(path)) == cached  # the cache can't tell
+
+    try:
+        expected, fallback = rewrite.decode("utf-8"), None
+    except UnicodeDecodeError as e:
+        expected = rewrite[:e.start].decode("utf-8") + rewrite[e.start:].decode("cp1252", errors="replace")
+        fallback = e.start
+    assert core.read_text_file_lines(str(path)) == expected.splitlines()
+    assert core.get_cached_encoding(str(path)).fallback_offset == fallback
+
+
+
+def test_stale_encoding_entry_is_dropped_even_if_the_read_stops_early(tmp_path):
+    path = tmp_path / "rewritten.nc"
+    path.write_bytes(b"T1\n90\xb0\nPOST\n")
+    core.read_text_file_lines(str(path))
+    st = path.stat()
+    path.write_bytes("T1\n90é\nPOS\n".encode("utf-8"))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert core.get_cached_encoding(str(path)).fallback_offset == 5
+
+    lines = core.iter_text_file_lines(str(path))
+    assert next(lines) == "T1"
+    assert next(lines) == "90é"
+    lines.close()
+    assert core.get_cached_encoding(str(path)) is None
+
+@pytest.mark.parametrize("backend", ["bytes", "mmap"])
+@pytest.mark.parametrize("seed", SEEDS)
+def test_bytes_engines_match_text_engine(seed, backend, tmp_path, monkeypatch):
+    path = tmp_path / "scan.nc"
+    make_nc_file(path, seed)
+    monkeypatch.setattr(core, "SCAN_CHUNK_BYTES", random.Random(seed).choice([1, 5, 17, 4096]))
+
+    for case_sensitive in (False, True):
+        expected = scan(path, case_sensitive=case_sensitive, backend="text")
+        assert scan(path, case_sensitive=case_sensitive, backend=backend) == expected, seed
+
+
+@pytest.mark.parametrize("seed", range(0, 150, 10))
+def test_parallel_scan_matches_sequential(seed, tmp_path, monkeypatch):
+    path = tmp_path / "scan.nc"
+    make_nc_file(path, seed)
+    monkeypatch.setattr(core, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(core, "SCAN_CHUNK_BYTES", 5)
+
+    expected = scan(path, backend="bytes")
+    # 3 workers split the file into up to 12 ranges, so context is stitched across them
+    assert scan(path, backend="bytes", workers=3) == expected, seed
+    assert scan(path, backend="mmap", workers=3) == expected, seed
+
+
+@pytest.mark.parametrize("before,after", [(1, 0), (0, 1), (3, 2), (10, 10)])
+@pytest.mark.parametrize("seed", range(0, 150, 5))
+def test_context_lines_across_chunks(seed, before, after, tmp_path, monkeypatch):
+    path = tmp_path / "scan.nc"
+    make_nc_file(path, seed)
+    monkeypatch.setattr(core, "READ_CHUNK_BYTES", 3)
+    monkeypatch.setattr(core, "SCAN_CHUNK_BYTES", random.Random(seed).choice([1, 5, 17]))
+    lines = [line.strip() for line in path.read_bytes().decode("utf-8").splitlines()]
+
+    expected = scan(path, backend="text", context_before=before, context_after=after)
+    for row in expected:
+        n = row["line_number"] - 1
+        # A side that was not requested is left out of the row
+        assert row.get("context_before", "") == "\n".join(lines[max(0, n - before):n])
+        assert row.get("context_after", "") == "\n".join(lines[n + 1:n + 1 + after])
+
+    for backend in ("bytes", "mmap"):
+        rows = scan(path, backend=backend, context_before=before, context_after=after)
+        assert rows == expected, (seed, backend)
+
+
+# Inputs where bytes-level splitting, stripping or matching differs from str's
+ODD_LINES = [
+    "ÄT12 M06",  # \b before T is no word boundary in str
+    "T12é",  # nor after the digits
+    "T１２ M06",  # full-width digits are \d in str
+    "A\x0cB POST-GENERATED",  # form feed is a line break for str.splitlines()
+    "C\rPOST-GENERATED D",  # so is a bare CR
+    "x\x1fT12",  # \x1f is whitespace to str
+    "\u212aey POST-GENERATED\x85after",  # Kelvin sign lowercases to 'k'; NEL breaks the line
+    "\xa0POST-GENERATED T 7\xa0",
+]
+
+
+@pytest.mark.parametrize("odd", ODD_LINES)
+@pytest.mark.parametrize("backend", ["bytes", "mmap", "auto"])
+def test_bytes_engines_match_text_engine_on_odd_lines(odd, backend, tmp_path):
+    path = tmp_path / "odd.nc"
+    path.write_bytes(f"OPERATION NAME A\nT3 M06\n{odd}\nPOST-GENERATED\n".encode("utf-8"))
+
+    for case_sensitive in (False, True):
+        settings = dict(SCAN_SETTINGS, target_text=["POST-GENERATED", "KEY"], case_sensitive=case_sensitive)
+        expected, _ = core.scan_file_for_hits(str(path), **dict(settings, backend="text"))
+        rows, _ = core.scan_file_for_hits(str(path), **dict(settings, backend=backend))
+        assert rows == expected
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_bytes_engines_match_text_engine_with_odd_lines_mixed_in(seed, tmp_path, monkeypatch):
+    path = tmp_path / "scan.nc"
+    make_nc_file(path, seed)
+    rnd = random.Random(seed)
+    lines = path.read_bytes().split(b"\n")
+    for _ in range(3):
+        lines.insert(rnd.randint(0, len(lines)), rnd.choice(ODD_LINES).encode("utf-8"))
+    path.write_bytes(b"\n".join(lines))
+    monkeypatch.setattr(core, "SCAN_CHUNK_BYTES", rnd.choice([1, 5, 17, 4096]))
+
+    expected = scan(path, backend="text", context_before=2, context_after=1)
+    for backend in ("bytes", "mmap"):
+        assert scan(path, backend=backend, context_before=2, context_after=1) == expected, (seed, backend)
+
+
+@pytest.mark.parametrize("backend", ["text", "bytes", "mmap"])
+def test_line_with_two_targets_gives_a_row_per_target(backend, tmp_path):
+    path = tmp_path / "two.nc"
+    path.write_bytes(b"T5 M06\nRAPID-CLAMP POST-GENERATED\nPOST-GENERATED\n")
+    settings = dict(SCAN_SETTINGS, target_text=["POST-GENERATED", "RAPID-CLAMP"])
+
+    rows, total = core.scan_file_for_hits(str(path), **settings, context_before=1, backend=backend)
+
+    assert total == 3
+    assert [(r["hit_index"], r["line_number"], r["target_text"]) for r in rows] == [
+        (1, 2, "POST-GENERATED"),
+        (2, 2, "RAPID-CLAMP"),
+        (3, 3, "POST-GENERATED"),
+    ]
+    assert rows[1]["context_before"] == "T5 M06"
+    assert rows[1]["tool_number"] == 5
+
+
+def incremental(path, state_dir):
+    from mcdtargethunter.mcd_hunter_incremental import scan_file_incremental
+
+    return scan_file_incremental(str(path), **SCAN_SETTINGS, state_dir=str(state_dir))
+
+
+def test_incremental_scan_resumes_where_it_left_off(tmp_path):
+    path = tmp_path / "growing.nc"
+    make_nc_file(path, 7)
+    full = path.read_bytes()
+    cut = full.index(b"\n", len(full) // 2) + 1
+    path.write_bytes(full[:cut] + b"POST-GEN")  # partial last line: left for the next run
+
+    first, total, resumed = incremental(path, tmp_path / "state")
+    assert not resumed
+    path.write_bytes(full)
+    second, total, resumed = incremental(path, tmp_path / "state")
+    assert resumed
+
+    expected = scan(path, backend="text")
+    assert first + second == expected
+    assert total == len(expected)
+    third, _, resumed = incremental(path, tmp_path / "state")
+    assert resumed and third == []
+
+
+def test_incremental_scan_starts_over_after_truncation(tmp_path):
+    path = tmp_path / "truncated.nc"
+    path.write_bytes(b"T1 M06\nPOST-GENERATED\nT2 M06\nPOST-GENERATED\n")
+    incremental(path, tmp_path / "state")
+
+    path.write_bytes(b"T1 M06\nPOST-GENERATED\n")
+    rows, total, resumed = incremental(path, tmp_path / "state")
+    assert not resumed
+    assert rows == scan(path, backend="text") and total == 1
+
+
+def test_incremental_scan_starts_over_after_a_mid_file_edit(tmp_path):
+    path = tmp_path / "edited.nc"
+    filler = b"G01 X1.0 Y2.0\n" * 20000  # well past any head/tail sample
+    path.write_bytes(b"T1 M06\n" + filler + b"POST-GENERATED\n" + filler + b"POST-GENERATED\n")
+    incremental(path, tmp_path / "state")
+
+    data = path.read_bytes()
+    middle = data.index(b"POST-GENERATED")
+    path.write_bytes(data[:middle - 7] + b"T9 M06\n" + data[middle:])  # same size
+    rows, _, resumed = incremental(path, tmp_path / "state")
+    assert not resumed
+    assert [r["tool_number"] for r in rows] == [9, 9]
+    assert rows == scan(path, backend="text")
+
+
+# Escape forms that can stand for an uppercase letter (or flip meaning) once
+# the pattern is lowercased, next to ones that survive it
+SCREEN_PATTERNS = [
+    r"\x50OST", r"\x50ost", r"\120OST", r"\0", r"POST", r"\U00000050OST",
+    r"\N{LATIN CAPITAL LETTER P}OST", r"[A-Z]OST", r"[A-z]OST", r"[^a-z]OST",
+    r"[P]OST", r"[\x50]OST", r"\DOST", r"\WOST", r"\BOST", r"\AP", r"T\Z",
+    r"(?-i:P)OST", r"\d+\s*OST", r"\bPOST\b", r"P\.OST", r"\tP",
+]
+SCREEN_LINES = [
+    "POST", "post", "xPOST", "9POST", "ÄPOST", "P.OST", "p.ost", "\tPost",
+    "T", "t", "\x00", "[OST", "_POST_", "",
+]
+
+
+@pytest.mark.parametrize("pattern", SCREEN_PATTERNS)
+@pytest.mark.parametrize("other", [None, "TOOL"])
+def test_regex_screen_matches_ignorecase_search(pattern, other):
+    needles = [(core.TRACK_TARGET, pattern)] + ([(core.TRACK_OP_NO, other)] if other else [])
+    matcher = core.TrackerMatcher(needles, case_sensitive=False, regex=True)
+
+    for line in SCREEN_LINES:
+        expected = 0
+        for bit, needle in needles:
+            if re.search(needle, line, re.IGNORECASE):
+                expected |= bit
+        assert matcher.match(line) == expected, (pattern, line)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"\x50OST", r"\120OST", r"\U00000050OST", r"\N{LATIN CAPITAL LETTER P}OST",
+    r"[A-z]OST", r"\DOST", r"(?-i:P)OST", "ÄPOST",
+])
+def test_lowercase_screen_is_not_used_for_case_carrying_escapes(pattern):
+    assert not core._lowercase_safe(pattern)
+
+
+@pytest.mark.parametrize("pattern", [r"\d+\s*OST", r"\bPOST\b", r"P\.OST", r"\tP", "POST-GENERATED"])
+def test_lowercase_screen_is_used_for_plain_patterns(pattern):
+    assert core._lowercase_safe(pattern)
+
+
+def indexed(path, db_path, **kwargs):
+    from mcdtargethunter.mcd_hunter_index import scan_file_for_hits_indexed
+
+    settings = dict(SCAN_SETTINGS, **kwargs)
+    return scan_file_for_hits_indexed(str(path), **settings, index_db_path=str(db_path))
+
+
+def scan_targets(path, targets):
+    return core.scan_file_for_hits(str(path), **dict(SCAN_SETTINGS, target_text=targets), backend="text")[0]
+
+
+@pytest.mark.parametrize("seed", range(0, 150, 15))
+def test_indexed_scan_matches_fresh_scan(seed, tmp_path):
+    path = tmp_path / "scan.nc"
+    make_nc_file(path, seed)
+    db_path = tmp_path / "index.sqlite"
+
+    rows, total, used_index = indexed(path, db_path)
+    assert not used_index
+    assert rows == scan(path, backend="text") and total == len(rows)
+
+    # Another target with the same context settings is served from the index
+    targets = ["M06", "TOOL CALL", "G01"]
+    rows, total, used_index = indexed(path, db_path, target_text=targets)
+    assert used_index
+    assert rows == scan_targets(path, targets)
+
+
+def test_index_is_rebuilt_when_the_file_changes(tmp_path):
+    path = tmp_path / "changed.nc"
+    path.write_bytes(b"T1 M06\nPOST-GENERATED\n")
+    db_path = tmp_path / "index.sqlite"
+    indexed(path, db_path)
+
+    path.write_bytes(b"T2 M06\nPOST-GENERATED\n")  # same size
+    rows, _, used_index = indexed(path, db_path)
+    assert not used_index
+    assert [r["tool_number"] for r in rows] == [2]
+    assert indexed(path, db_path)[2]
+
+
+def test_index_database_is_bounded(tmp_path, monkeypatch):
+    from mcdtargethunter import mcd_hunter_index
+
+    monkeypatch.setattr(mcd_hunter_index, "INDEX_MAX_ENTRIES", 2)
+    db_path = tmp_path / "index.sqlite"
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"part{i}.nc"
+        path.write_bytes(b"T1 M06\nPOST-GENERATED\n")
+        paths.append(path)
+        indexed(path, db_path)
+
+    def indexed_paths():
+        conn = mcd_hunter_index._connect(str(db_path))
+        try:
+            return {row[0] for row in conn.execute("SELECT path FROM indexed_files")}
+        finally:
+            conn.close()
+
+    assert indexed_paths() == {str(paths[2]), str(paths[3])}
+
+    paths[3].unlink()
+    indexed(paths[0], db_path, case_sensitive=True)  # new settings: another entry
+    assert indexed_paths() == {str(paths[0]), str(paths[2])}
@@ -0,0 +1,102 @@
+"""
+MCD Target Hunter - Scan Server Tests
+
+Purpose:
+    Request validation and HTTP edge cases of the scan server, against a
+    server on a free local port.
+"""
+
+import json
+import socket
+import threading
+
+import pytest
+
+from mcdtargethunter.mcd_hunter_core import AppConfig
+from mcdtargethunter.mcd_hunter_server import (
+    ScanRequestError,
+    make_scan_server,
+    resolve_scan_request,
+)
+
+
+@pytest.fixture(autouse=True)
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "appdata"))
+
+
+@pytest.fixture
+def nc_file(tmp_path):
+    path = tmp_path / "part.nc"
+    path.write_bytes(b"OPERATION NAME A\nT3 M06\nPOST-GENERATED\n")
+    return str(path)
+
+
+@pytest.fixture
+def server():
+    srv = make_scan_server(port=0, config=AppConfig(), quiet=True)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def exchange(server, raw: bytes) -> bytes:
+    """Sends raw request bytes and returns everything read until the server closes."""
+    with socket.create_connection(server.server_address, timeout=5) as sock:
+        sock.sendall(raw)
+        sock.shutdown(socket.SHUT_WR)
+        chunks = []
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return b"".join(chunks)
+            chunks.append(data)
+
+
+def post(body: bytes, content_length: str) -> bytes:
+    return (
+        b"POST /scan HTTP/1.1\r\nHost: x\r\nContent-Length: " + content_length.encode("ascii") + b"\r\n\r\n" + body
+    )
+
+
+@pytest.mark.parametrize("target_text", [[["x"]], ["x", 5], [], ""])
+def test_bad_target_lists_are_request_errors(target_text, nc_file):
+    with pytest.raises(ScanRequestError):
+        resolve_scan_request({"input_path": nc_file, "target_text": target_text}, AppConfig())
+
+
+def test_nested_target_list_gets_a_400(server, nc_file):
+    body = json.dumps({"input_path": nc_file, "target_text": [["x"]]}).encode("utf-8")
+    reply = exchange(server, post(body, str(len(body))))
+    assert reply.startswith(b"HTTP/1.1 400")
+
+
+def test_negative_content_length_is_rejected(server):
+    reply = exchange(server, post(b"", "-1"))
+    assert reply.startswith(b"HTTP/1.1 400")
+    assert b"Invalid Content-Length" in reply
+
+
+def test_oversized_body_closes_the_connection(server, nc_file, monkeypatch):
+    from mcdtargethunter import mcd_hunter_server
+
+    monkeypatch.setattr(mcd_hunter_server, "_MAX_BODY_BYTES", 16)
+    # The unread body would otherwise be parsed as a second request
+    smuggled = b"GET /health HTTP/1.1\r\nHost: x\r\n\r\n"
+    reply = exchange(server, post(smuggled, str(len(smuggled))))
+    assert reply.startswith(b"HTTP/1.1 400")
+    assert b"Connection: close" in reply
+    assert reply.count(b"HTTP/1.1 ") == 1
+
+
+def test_scan_streams_rows_then_done(server, nc_file):
+    body = json.dumps({"input_path": nc_file, "target_text": "POST-GENERATED"}).encode("utf-8")
+    reply = exchange(server, post(body, str(len(body))))
+    head, _, payload = reply.partition(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 200")
+    lines = [line for line in payload.split(b"\r\n") if line.startswith(b"{")]
+    rows = [json.loads(x) for chunk in lines for x in chunk.splitlines()]
+    assert rows[0]["line_number"] == 3 and rows[0]["tool_number"] == 3
+    assert rows[-1]["done"] is True and rows[-1]["total_hits"] == 1